@@ -10,11 +10,12 @@ from routes.pages import pages_bp
 from utils.helpers import check_ffmpeg_available
 from database import init_database
 from task_queue import init_job_queue
-from task_queue.handlers import JOB_HANDLERS
+from task_queue.handlers import JOB_HANDLERS, BATCH_JOB_HANDLERS, JOB_POOLS
 from services.browser_service import BrowserManager
 import logging
 import atexit
 import asyncio
+from functools import lru_cache
 from dotenv import load_dotenv
 from werkzeug.middleware.proxy_fix import ProxyFix
 
@@ -39,16 +40,27 @@ def create_app():
     User.ensure_admin()
     logger.info("Database initialized successfully")
     
-    # Initialize job queue with 4 workers
-    logger.info("Initializing job queue with 4 workers...")
-    job_queue = init_job_queue(num_workers=4)
+    # Initialize job queue with a worker pool per resource class
+    logger.info("Initializing job queue...")
+    job_queue = init_job_queue(
+        num_workers=Config.NUM_JOB_WORKERS,
+        pool_config={'download': Config.DOWNLOAD_WORKERS, 'transcribe': Config.TRANSCRIBE_WORKERS},
+        job_pools=JOB_POOLS
+    )
     
     # Register job handlers
     logger.info("Registering job handlers...")
     for job_type, handler in JOB_HANDLERS.items():
         job_queue.register_handler(job_type, handler)
+    for job_type, (handler, max_batch) in BATCH_JOB_HANDLERS.items():
+        job_queue.register_batch_handler(job_type, handler, max_batch)
     logger.info(f"Registered {len(JOB_HANDLERS)} job handlers")
     
+    # Warm the default Whisper model so it's shared by every caption job from the start
+    if Config.WHISPER_PRELOAD:
+        from services.caption_service import init_whisper
+        init_whisper(Config.WHISPER_MODEL_DEFAULT)
+    
     # Store job queue in app config for access in routes
     app.config['JOB_QUEUE'] = job_queue
     
@@ -67,6 +79,33 @@ def create_app():
     # Import and register settings blueprint
     from routes.settings import settings_bp
     app.register_blueprint(settings_bp)
+    
+    # Compile every template (index.html alone is ~40 KB, plus the partials it includes) now rather
+    # than on first visits; Jinja keeps them cached and, outside debug, never re-checks the files
+    for template in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template)
+
+    # Static links carry the file's mtime as ?v=, so a versioned asset can be cached for good
+    # (the same scheme as the video URLs) and a deploy that edits it changes its URL
+    @lru_cache(maxsize=None)
+    def static_version(filename):
+        try:
+            return int(os.path.getmtime(os.path.join(app.static_folder, filename)))
+        except OSError:
+            return None
+
+    @app.url_defaults
+    def version_static_urls(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            version = static_version(values['filename'])
+            if version is not None:
+                values['v'] = version
+
+    @app.after_request
+    def cache_versioned_static(response):
+        if request.endpoint == 'static' and request.args.get('v') and response.status_code in (200, 304):
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
 
     @app.route('/sw.js')
     def serve_sw():
@@ -143,8 +182,11 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     logger.info(f"Starting Flask-SocketIO server on http://0.0.0.0:{port}")
     
-    # Run a one-time cleanup on startup
-    from utils.cleanup import run_storage_cleanup
-    run_storage_cleanup(max_age_hours=48)
+    # Run a one-time cleanup on startup, in the background so the server comes up right away
+    from utils.cleanup import run_storage_cleanup_async
+    run_storage_cleanup_async(max_age_hours=48)
     
-    socketio.run(app, debug=False, host='0.0.0.0', port=port, allow_unsafe_werkzeug=True)
+    # Development fallback (production runs gunicorn via wsgi.py). Debug stays opt-in and never
+    # reloads: the reloader would import this module twice and start a second job queue
+    socketio.run(app, debug=os.environ.get('FLASK_DEBUG') == '1', use_reloader=False,
+                 host='0.0.0.0', port=port, allow_unsafe_werkzeug=True)
@@ -7,15 +7,30 @@ logger = logging.getLogger(__name__)
 
 class Config:
     MAX_CONTENT_LENGTH = 500 * 1024 * 1024  # 500MB max
+    # Behind nginx/Apache, hand video bytes (and Range handling) to the proxy via X-Sendfile
+    # so a request thread is released as soon as the headers are out
+    USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE', '0') == '1'
+    # nginx equivalent: internal location prefix that maps to the app directory (e.g. '/_internal');
+    # video responses become an empty X-Accel-Redirect to <prefix>/<folder>/<file>
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX', '').rstrip('/')
     UPLOAD_FOLDER = 'downloads'
     PROCESSED_FOLDER = 'processed'
     CAPTIONS_FOLDER = 'captions'
+    # Resolved once at import so path checks don't repeat getcwd + normalisation
+    UPLOAD_FOLDER_ABS = os.path.abspath(UPLOAD_FOLDER)
+    PROCESSED_FOLDER_ABS = os.path.abspath(PROCESSED_FOLDER)
+    CAPTIONS_FOLDER_ABS = os.path.abspath(CAPTIONS_FOLDER)
     
     # Database configuration
     DATABASE_PATH = 'video_platform.db'
     
     # Job queue configuration
-    NUM_JOB_WORKERS = 4  # Number of concurrent job workers
+    # Handlers mostly wait on network or ffmpeg children, so more jobs can be in flight than encodes
+    NUM_JOB_WORKERS = int(os.environ.get('NUM_JOB_WORKERS', 8))  # Workers for transcode and other jobs
+    # Downloads and transcription get their own worker pools so they never queue behind encodes
+    DOWNLOAD_WORKERS = int(os.environ.get('DOWNLOAD_WORKERS', 8))
+    TRANSCRIBE_WORKERS = int(os.environ.get('TRANSCRIBE_WORKERS', 1))  # Whisper passes run one at a time per model anyway
+    MAX_CONCURRENT_ENCODES = int(os.environ.get('MAX_CONCURRENT_ENCODES', 4))  # Re-encodes running at once across workers
     JOB_RETENTION_DAYS = 30  # Days to keep completed jobs
     
     # Video processing
@@ -23,7 +38,48 @@ class Config:
     RETRY_DELAY = 2  # seconds
     DOWNLOAD_TIMEOUT = 300  # 5 minutes
     PROCESS_TIMEOUT = 600  # 10 minutes
+    # Run each yt-dlp download in its own process: its transfer and fragment loops are pure Python and
+    # would otherwise hold this process's GIL against the request threads serving video
+    YTDLP_SUBPROCESS = os.environ.get('YTDLP_SUBPROCESS', '1') == '1'
+    # H.264 encoder: 'auto' probes for NVENC / QuickSync / VAAPI / VideoToolbox and falls back to libx264
+    VIDEO_ENCODER = os.environ.get('VIDEO_ENCODER', 'auto')
+    VAAPI_DEVICE = os.environ.get('VAAPI_DEVICE', '/dev/dri/renderD128')
+    HWACCEL_DECODE = os.environ.get('HWACCEL_DECODE', '1') == '1'  # Let ffmpeg decode inputs on the GPU when it can
+    # libx264 threads per encode so concurrent job workers don't oversubscribe the CPU
+    FFMPEG_THREADS_PER_JOB = int(os.environ.get('FFMPEG_THREADS_PER_JOB', max(2, (os.cpu_count() or 2) // MAX_CONCURRENT_ENCODES)))
+    # libx264 speed override for every software encode (e.g. 'ultrafast', ~2.5x faster than 'fast' at larger
+    # files); empty keeps each operation's own preset. zerolatency drops B-frames and lookahead for more speed
+    X264_PRESET = os.environ.get('X264_PRESET', '')
+    X264_ZEROLATENCY = os.environ.get('X264_ZEROLATENCY', '0') == '1'
+    GPU_SUBTITLE_BLEND = os.environ.get('GPU_SUBTITLE_BLEND', '1') == '1'  # overlay_cuda caption compositing on NVENC
+    FFMPEG_PIN_CPUS = os.environ.get('FFMPEG_PIN_CPUS', '0') == '1'  # taskset each encode onto its own core range (Linux)
+    # ffmpeg runs at lower CPU (nice) and I/O (ionice best-effort) priority so request threads
+    # serving video stay responsive during encodes (Linux); 0 / '0' leaves the priority alone
+    FFMPEG_NICE = int(os.environ.get('FFMPEG_NICE', 10))
+    FFMPEG_IONICE = os.environ.get('FFMPEG_IONICE', '1') == '1'
+    # Scene detection runs on a downscaled, frame-skipped stream; cuts stay accurate for multi-second scenes
+    SCENE_DETECT_DOWNSCALE = int(os.environ.get('SCENE_DETECT_DOWNSCALE', 4))
+    SCENE_DETECT_FRAME_SKIP = int(os.environ.get('SCENE_DETECT_FRAME_SKIP', 2))
+    # Frame-accurate scene splits encode this many scene ranges at once (e.g. one per NVENC engine)
+    PARALLEL_SPLIT_ENCODES = int(os.environ.get('PARALLEL_SPLIT_ENCODES', 2))
+    # Queued stream-copy trims of one source that a worker cuts together in a single ffmpeg run
+    TRIM_BATCH_SIZE = int(os.environ.get('TRIM_BATCH_SIZE', 8))
     WHISPER_MODEL_DEFAULT = 'tiny'
+    # 'auto' picks CUDA when available; compute type defaults to int8 on CPU, float16 on GPU
+    WHISPER_DEVICE = os.environ.get('WHISPER_DEVICE', 'auto')
+    WHISPER_COMPUTE_TYPE = os.environ.get('WHISPER_COMPUTE_TYPE', 'auto')
+    WHISPER_BATCH_SIZE = int(os.environ.get('WHISPER_BATCH_SIZE', 16))
+    WHISPER_PRELOAD = os.environ.get('WHISPER_PRELOAD', '1') == '1'  # Load default model at startup
+    # Persistent download cache for model weights, so restarts load from disk instead of the hub
+    MODEL_CACHE_DIR = os.environ.get('MODEL_CACHE_DIR', os.path.join('models', 'whisper'))
+    WHISPER_VAD = os.environ.get('WHISPER_VAD', '1') == '1'  # Silero VAD skips non-speech audio
+    WHISPER_VAD_MIN_SILENCE_MS = int(os.environ.get('WHISPER_VAD_MIN_SILENCE_MS', 500))
+    # Queued caption jobs a worker picks up together; their audio shares batched Whisper passes
+    CAPTION_BATCH_SIZE = int(os.environ.get('CAPTION_BATCH_SIZE', 8))
+    CAPTION_BATCH_MAX_SECONDS = int(os.environ.get('CAPTION_BATCH_MAX_SECONDS', 3600))  # Audio held in memory per pass
+    # Reusable caption burns live outside the served media folders; least recently used entries go past the cap
+    BURN_CACHE_DIR = os.environ.get('BURN_CACHE_DIR', 'burn_cache')
+    BURN_CACHE_MAX_MB = int(os.environ.get('BURN_CACHE_MAX_MB', 2048))
     
     # Security
     SECRET_KEY = os.environ.get('SECRET_KEY', 'default-secret-key-12345')
@@ -14,6 +14,22 @@ from database.schema import get_db_manager
 
 logger = logging.getLogger(__name__)
 
+# JSON columns (job input/output, caption styles, settings) are encoded on every job read
+# and progress write; orjson does that in C, the stdlib json module is the fallback
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+if HAS_ORJSON:
+    def _json_dumps(value) -> str:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    _json_loads = orjson.loads
+else:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 
 class BaseModel:
     """Base model with common CRUD operations."""
@@ -227,6 +243,28 @@ class Video(BaseModel):
         logger.info(f"Created video: {video_id} - {title}")
         return cls.get_by_id(video_id)
     
+    @classmethod
+    def create_many(cls, records: List[Dict[str, Any]]) -> List[str]:
+        """Insert several videos in one transaction and return their IDs in order."""
+        if not records:
+            return []
+        db = get_db_manager()
+        video_ids = [str(uuid.uuid4()) for _ in records]
+        
+        db.execute_many(
+            """INSERT INTO videos 
+               (id, project_id, title, filename, source_url, duration, 
+                width, height, size_bytes, is_clip, parent_video_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(video_id, r['project_id'], r['title'], r['filename'], r.get('source_url'),
+              r.get('duration'), r.get('width'), r.get('height'), r.get('size_bytes'),
+              r.get('is_clip', 0), r.get('parent_video_id'))
+             for video_id, r in zip(video_ids, records)]
+        )
+        
+        logger.info(f"Created {len(video_ids)} videos")
+        return video_ids
+    
     @classmethod
     def get_by_id(cls, video_id: str) -> Optional[Dict[str, Any]]:
         """Get video by ID."""
@@ -356,7 +394,7 @@ class Job(BaseModel):
         job_id = str(uuid.uuid4())
         db = get_db_manager()
         
-        input_json = json.dumps(input_data) if input_data else None
+        input_json = _json_dumps(input_data) if input_data else None
         
         db.execute_write(
             """INSERT INTO jobs 
@@ -383,9 +421,9 @@ class Job(BaseModel):
         # Parse JSON fields
         if result:
             if result.get('input_data'):
-                result['input_data'] = json.loads(result['input_data'])
+                result['input_data'] = _json_loads(result['input_data'])
             if result.get('output_data'):
-                result['output_data'] = json.loads(result['output_data'])
+                result['output_data'] = _json_loads(result['output_data'])
         
         return result
     
@@ -405,9 +443,9 @@ class Job(BaseModel):
         # Parse JSON fields
         for job in jobs:
             if job.get('input_data'):
-                job['input_data'] = json.loads(job['input_data'])
+                job['input_data'] = _json_loads(job['input_data'])
             if job.get('output_data'):
-                job['output_data'] = json.loads(job['output_data'])
+                job['output_data'] = _json_loads(job['output_data'])
         
         return jobs
     
@@ -424,9 +462,9 @@ class Job(BaseModel):
         # Parse JSON fields
         for job in jobs:
             if job.get('input_data'):
-                job['input_data'] = json.loads(job['input_data'])
+                job['input_data'] = _json_loads(job['input_data'])
             if job.get('output_data'):
-                job['output_data'] = json.loads(job['output_data'])
+                job['output_data'] = _json_loads(job['output_data'])
         
         return jobs
     
@@ -443,9 +481,9 @@ class Job(BaseModel):
         # Parse JSON fields
         for job in jobs:
             if job.get('input_data'):
-                job['input_data'] = json.loads(job['input_data'])
+                job['input_data'] = _json_loads(job['input_data'])
             if job.get('output_data'):
-                job['output_data'] = json.loads(job['output_data'])
+                job['output_data'] = _json_loads(job['output_data'])
         
         return jobs
     
@@ -464,7 +502,7 @@ class Job(BaseModel):
             updates['error_message'] = error_message
         
         if output_data:
-            updates['output_data'] = json.dumps(output_data)
+            updates['output_data'] = _json_dumps(output_data)
         
         # Set timestamps based on status
         if status == cls.STATUS_RUNNING and not updates.get('started_at'):
@@ -482,6 +520,18 @@ class Job(BaseModel):
         
         return None
     
+    @classmethod
+    def update_progress_many(cls, updates: List[tuple]) -> None:
+        """Write (job_id, progress, output_data) for several running jobs in one transaction."""
+        if not updates:
+            return
+        db = get_db_manager()
+        db.execute_many(
+            "UPDATE jobs SET progress = ?, output_data = COALESCE(?, output_data) WHERE id = ? AND status = ?",
+            [(progress, _json_dumps(output_data) if output_data else None, job_id, cls.STATUS_RUNNING)
+             for job_id, progress, output_data in updates]
+        )
+    
     @classmethod
     def cancel(cls, job_id: str) -> bool:
         """Cancel a job."""
@@ -552,7 +602,7 @@ class Caption(BaseModel):
         caption_id = str(uuid.uuid4())
         db = get_db_manager()
         
-        style_json = json.dumps(style) if style else None
+        style_json = _json_dumps(style) if style else None
         
         db.execute_write(
             """INSERT INTO captions 
@@ -576,7 +626,7 @@ class Caption(BaseModel):
         result = cls._row_to_dict(row)
         
         if result and result.get('style'):
-            result['style'] = json.loads(result['style'])
+            result['style'] = _json_loads(result['style'])
         
         return result
     
@@ -592,10 +642,29 @@ class Caption(BaseModel):
         
         for caption in captions:
             if caption.get('style'):
-                caption['style'] = json.loads(caption['style'])
+                caption['style'] = _json_loads(caption['style'])
         
         return captions
     
+    @classmethod
+    def get_by_project(cls, project_id: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Get all captions for a project's videos in one query, grouped by video ID."""
+        db = get_db_manager()
+        rows = db.execute_query(
+            """SELECT c.* FROM captions c JOIN videos v ON v.id = c.video_id
+               WHERE v.project_id = ? AND c.is_deleted = 0
+               ORDER BY c.created_at DESC""",
+            (project_id,)
+        )
+        
+        by_video = {}
+        for caption in cls._rows_to_list(rows):
+            if caption.get('style'):
+                caption['style'] = _json_loads(caption['style'])
+            by_video.setdefault(caption['video_id'], []).append(caption)
+        
+        return by_video
+    
     @classmethod
     def update(cls, caption_id: str, **kwargs) -> Optional[Dict[str, Any]]:
         """Update caption fields."""
@@ -603,7 +672,7 @@ class Caption(BaseModel):
         updates = {k: v for k, v in kwargs.items() if k in allowed_fields}
         
         if 'style' in kwargs:
-            updates['style'] = json.dumps(kwargs['style'])
+            updates['style'] = _json_dumps(kwargs['style'])
         
         if not updates:
             return cls.get_by_id(caption_id)
@@ -655,7 +724,7 @@ class Setting(BaseModel):
         
         if row:
             try:
-                return json.loads(row['value'])
+                return _json_loads(row['value'])
             except:
                 return row['value']
         
@@ -668,7 +737,7 @@ class Setting(BaseModel):
         
         # Convert value to JSON string if not already string
         if not isinstance(value, str):
-            value = json.dumps(value)
+            value = _json_dumps(value)
         
         db.execute_write(
             """INSERT OR REPLACE INTO settings (key, value, description)
@@ -694,7 +763,7 @@ class Setting(BaseModel):
         settings = {}
         for row in rows:
             try:
-                settings[row['key']] = json.loads(row['value'])
+                settings[row['key']] = _json_loads(row['value'])
             except:
                 settings[row['key']] = row['value']
         
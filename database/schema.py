@@ -5,6 +5,7 @@ Provides a professional, scalable SQLite database structure.
 
 import sqlite3
 import logging
+import queue
 import time
 from typing import Optional
 from contextlib import contextmanager
@@ -157,9 +158,13 @@ class DatabaseManager:
     Implements best practices for SQLite in multi-threaded environments.
     """
     
+    # Idle connections kept open for reuse; more can be opened under load and are closed on return
+    POOL_SIZE = 8
+    
     def __init__(self, db_path: str = 'video_platform.db'):
         self.db_path = db_path
         self._lock = Lock()
+        self._pool = queue.LifoQueue(maxsize=self.POOL_SIZE)
         self._initialized = False
         logger.info(f"Database manager initialized with path: {db_path}")
     
@@ -192,38 +197,48 @@ class DatabaseManager:
                 logger.error(f"Failed to initialize database: {str(e)}")
                 raise
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection configured for concurrent use."""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            timeout=30.0,
+            isolation_level=None  # Autocommit mode for better concurrency
+        )
+        
+        # Configure connection for optimal performance
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        conn.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for concurrency
+        conn.execute("PRAGMA synchronous=NORMAL")  # Balance safety and performance
+        conn.execute("PRAGMA cache_size=10000")  # Increase cache size
+        conn.execute("PRAGMA temp_store=MEMORY")  # Store temp tables in memory
+        conn.execute("PRAGMA foreign_keys=ON")  # Enable foreign key constraints
+        return conn
+    
     @contextmanager
     def get_connection(self):
         """
-        Get a database connection with proper configuration.
-        Use as context manager for automatic cleanup.
+        Get a pooled database connection with proper configuration.
+        Use as context manager; the connection goes back to the pool afterwards.
         """
-        conn = None
+        # Reusing connections skips the open, the PRAGMAs and a cold page cache on every query
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        
         try:
-            conn = sqlite3.connect(
-                self.db_path,
-                check_same_thread=False,
-                timeout=30.0,
-                isolation_level=None  # Autocommit mode for better concurrency
-            )
-            
-            # Configure connection for optimal performance
-            conn.row_factory = sqlite3.Row  # Access columns by name
-            conn.execute("PRAGMA journal_mode=WAL")  # Write-Ahead Logging for concurrency
-            conn.execute("PRAGMA synchronous=NORMAL")  # Balance safety and performance
-            conn.execute("PRAGMA cache_size=10000")  # Increase cache size
-            conn.execute("PRAGMA temp_store=MEMORY")  # Store temp tables in memory
-            conn.execute("PRAGMA foreign_keys=ON")  # Enable foreign key constraints
-            
             yield conn
-            
         except Exception as e:
             logger.error(f"Database connection error: {str(e)}")
-            if conn:
-                conn.rollback()
             raise
         finally:
-            if conn:
+            try:
+                # Never hand an open transaction to the next user
+                if conn.in_transaction:
+                    conn.rollback()
+                self._pool.put_nowait(conn)
+            except (queue.Full, sqlite3.Error):
                 conn.close()
     
     def execute_query(self, query: str, params: tuple = (), fetch_one: bool = False):
@@ -266,10 +281,13 @@ class DatabaseManager:
     
     def execute_many(self, query: str, params_list: list) -> int:
         """Execute multiple INSERT/UPDATE/DELETE queries in a transaction."""
-        with self.get_connection() as conn:
-            cursor = conn.executemany(query, params_list)
-            conn.commit()
-            return cursor.rowcount
+        with self._lock:
+            with self.get_connection() as conn:
+                # Autocommit would commit each statement separately; group them into one
+                conn.execute("BEGIN")
+                cursor = conn.executemany(query, params_list)
+                conn.commit()
+                return cursor.rowcount
     
     def get_schema_version(self) -> int:
         """Get current database schema version."""
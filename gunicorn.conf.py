@@ -0,0 +1,18 @@
+"""gunicorn settings: gunicorn -c gunicorn.conf.py wsgi:application"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# One process only: the job queue, progress cache and Socket.IO sessions live in it.
+# Concurrency comes from threads; video bytes go out through sendfile, which releases the GIL
+workers = 1
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', max(64, (os.cpu_count() or 1) * 16)))
+sendfile = True
+
+# Players reuse connections for their run of Range requests
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 30))
+# Long-lived responses (video streams, Socket.IO polling) are not worker hangs
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+# Heartbeat file on tmpfs so a busy disk (encodes, cleanup) can't stall the worker's check-in
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
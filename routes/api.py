@@ -1,16 +1,24 @@
 import os
-import re
 import logging
 import shutil
+import time
+import mimetypes
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from datetime import datetime
+from urllib.parse import quote
 from flask import Blueprint, request, jsonify, send_file, Response, current_app, session
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import FileWrapper
 
 from config import Config
 from utils.helpers import (
     is_valid_url, 
     sanitize_filename, 
-    ensure_project_dirs
+    ensure_project_dirs,
+    load_admin_config,
+    probe_keyframes
 )
 from database.models import Project, Video, Job, Caption, User
 from task_queue.job_queue import get_job_queue
@@ -70,9 +78,10 @@ def project_videos(project_id):
         return jsonify({'error': 'Project not found'}), 404
     
     videos = Video.get_by_project(project_id)
-    # Add captions info to each video
+    # Add captions info to each video (one query for the whole project)
+    captions = Caption.get_by_project(project_id)
     for v in videos:
-        v['captions'] = Caption.get_by_video(v['id'])
+        v['captions'] = captions.get(v['id'], [])
     
     return jsonify(videos)
 
@@ -118,13 +127,9 @@ def download():
     # Load global proxy if enabled
     proxy = None
     try:
-        import json
-        config_path = os.path.join(os.getcwd(), 'admin_config.json')
-        if os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-                if config.get('proxy_enabled') and config.get('proxy'):
-                    proxy = config['proxy'].strip()
+        config = load_admin_config()
+        if config.get('proxy_enabled') and config.get('proxy'):
+            proxy = config['proxy'].strip()
     except: pass
 
     job_queue = current_app.config['JOB_QUEUE']
@@ -217,6 +222,7 @@ def burn_caption(project_id, video_id):
     data = request.get_json(force=True, silent=True) or {}
     caption_id = data.get('caption_id')
     style = data.get('style')
+    aspect = data.get('aspect')  # Optional: convert aspect in the same pass
 
     video = Video.get_by_id(video_id)
     if not video:
@@ -229,7 +235,8 @@ def burn_caption(project_id, video_id):
         video_id=video_id,
         input_data={
             'caption_id': caption_id,
-            'style': style
+            'style': style,
+            'aspect': aspect
         }
     )
     
@@ -240,6 +247,7 @@ def split_scenes_route(project_id, video_id):
     data = request.get_json(force=True, silent=True) or {}
     min_scene_len = data.get('min_scene_len', 2.0)
     threshold = data.get('threshold', 3.0)
+    frame_accurate = bool(data.get('frame_accurate', False))
 
     video = Video.get_by_id(video_id)
     if not video:
@@ -252,7 +260,8 @@ def split_scenes_route(project_id, video_id):
         video_id=video_id,
         input_data={
             'min_scene_len': min_scene_len,
-            'threshold': threshold
+            'threshold': threshold,
+            'frame_accurate': frame_accurate
         }
     )
     
@@ -277,12 +286,28 @@ def split_fixed_route(project_id, video_id):
     
     return jsonify({'id': job_id, 'status': 'pending'})
 
+@api_bp.route('/projects/<project_id>/videos/<video_id>/keyframes', methods=['GET'])
+def video_keyframes(project_id, video_id):
+    """Keyframe times, so the editor can snap trim starts to where a stream copy actually begins."""
+    video = Video.get_by_id(video_id)
+    if not video or video['project_id'] != project_id:
+        return jsonify({'error': 'Video not found'}), 404
+    path = resolve_media_path(video['filename'])
+    if not path:
+        return jsonify({'error': 'Video file not found'}), 404
+    try:
+        return jsonify({'keyframes': list(probe_keyframes(path))})
+    except Exception as e:
+        logger.error(f"Keyframe probe failed for {video_id}: {e}")
+        return jsonify({'error': 'Could not read keyframes'}), 500
+
 @api_bp.route('/projects/<project_id>/videos/<video_id>/trim', methods=['POST'])
 def trim_video_route(project_id, video_id):
     data = request.get_json(force=True, silent=True) or {}
     start = data.get('start_time', 0)
     end = data.get('end_time', 10)
     title = data.get('title', 'Clip')
+    frame_accurate = bool(data.get('frame_accurate', False))
 
     video = Video.get_by_id(video_id)
     if not video:
@@ -296,7 +321,8 @@ def trim_video_route(project_id, video_id):
         input_data={
             'start_time': start,
             'end_time': end,
-            'title': title
+            'title': title,
+            'frame_accurate': frame_accurate
         }
     )
     
@@ -307,7 +333,7 @@ def trim_video_route(project_id, video_id):
 @api_bp.route('/status/<job_id>')
 def get_status(job_id):
     """Get status of a job."""
-    job = Job.get_by_id(job_id)
+    job = current_app.config['JOB_QUEUE'].get_job_status(job_id)
     if not job:
         return jsonify({'status': 'not_found'}), 404
     return jsonify(job)
@@ -375,50 +401,285 @@ def retry_job(job_id):
         # If successfully marked as pending, add to queue
         job_queue = current_app.config['JOB_QUEUE']
         job = Job.get_by_id(job_id)
-        job_queue.queue.put((-job['priority'], job_id))
+        job_queue.enqueue(job['type'], job_id, job['priority'])
     return jsonify({'success': success})
 
 # --- Serving Files ---
 
+# Read size for video responses when the server has no zero-copy file wrapper (the Werkzeug
+# dev server); memory stays at one chunk per connection however large the requested range is
+STREAM_CHUNK_SIZE = 1 << 20
+
+def _chunked_file_wrapper(file, buffer_size=8192):
+    return FileWrapper(file, max(buffer_size, STREAM_CHUNK_SIZE))
+
+# Readahead hints (Linux/BSD): the kernel starts pulling the requested bytes off disk before the
+# sendfile/read reaches them, so a cold file stalls its request thread for less of the transfer
+HAS_FADVISE = hasattr(os, 'posix_fadvise')
+PREFETCH_BYTES = 8 << 20  # ahead of the range start; players request ranges in order anyway
+# Clips up to this size are read in whole when playback starts (a request from byte 0), so the
+# page cache holds the hot clip and every later range of it is a memory-speed sendfile
+PRELOAD_WHOLE_BYTES = 64 << 20
+
+def _prefetch(f, offset, length, size):
+    try:
+        fd = f.fileno()
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        if offset == 0 and size <= PRELOAD_WHOLE_BYTES:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            os.posix_fadvise(fd, offset, min(length, PREFETCH_BYTES), os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+
+_limited_wrappers = {}
+
+def _limited_file_wrapper(wrapper_cls):
+    """Subclass the server's file wrapper so its read fallback stops after the range.
+
+    gunicorn only sendfile()s instances of its own wrapper, and falls back to iterating it
+    (TLS, sendfile = False); the stock wrapper would then read the file to EOF per range.
+    """
+    limited = _limited_wrappers.get(wrapper_cls)
+    if limited is None:
+        class limited(wrapper_cls):
+            def __init__(self, filelike, blksize, length):
+                super().__init__(filelike, blksize)
+                self.remaining = length
+
+            def __iter__(self):
+                while self.remaining > 0:
+                    data = self.filelike.read(min(self.blksize, self.remaining))
+                    if not data:
+                        break
+                    self.remaining -= len(data)
+                    yield data
+
+        _limited_wrappers[wrapper_cls] = limited
+    return limited
+
+def _sendfile_range(response, f):
+    """Point a 206 body straight at the file, seeked to the range start.
+
+    Werkzeug serves ranges through its own iterator, which hides the file from the server;
+    handing gunicorn's wrapper an offset file instead lets it sendfile(2) exactly
+    Content-Length bytes from there, with no copies through Python. When sendfile isn't
+    usable the wrapper is iterated, reading no more than the range.
+    """
+    content_range = response.content_range
+    if content_range.units != 'bytes' or content_range.start is None:
+        return
+    f.seek(content_range.start)
+    wrapper_cls = _limited_file_wrapper(request.environ['wsgi.file_wrapper'])
+    response.response = wrapper_cls(f, STREAM_CHUNK_SIZE, content_range.stop - content_range.start)
+
+class _SocketSendfile:
+    """Body for the Werkzeug dev server, which has no zero-copy file wrapper.
+
+    The server flushes the status line and headers on the first (empty) chunk; the file range
+    then goes straight to the client socket with socket.sendfile().
+    """
+
+    def __init__(self, sock, f, offset, count):
+        self.sock = sock
+        self.f = f
+        self.offset = offset
+        self.count = count
+
+    def __iter__(self):
+        yield b''
+        if self.count:
+            self.sock.sendfile(self.f, self.offset, self.count)
+
+    def close(self):
+        self.f.close()
+
+def _video_not_found(path):
+    # Deleted since it was resolved; forget the cached location
+    with _media_path_lock:
+        _media_path_cache.pop(os.path.basename(path), None)
+    response = jsonify({'error': 'Video file not found'})
+    response.status_code = 404
+    return response
+
+def _x_accel_redirect(path, mime_type):
+    """Hand the whole transfer (Range, validators, sendfile) to nginx's internal location."""
+    real = os.path.realpath(path)
+    for root, folder in zip(_MEDIA_ROOTS, (Config.PROCESSED_FOLDER, Config.UPLOAD_FOLDER)):
+        if real.startswith(root + os.sep):
+            response = Response(mimetype=mime_type)
+            response.headers['X-Accel-Redirect'] = quote(
+                f"{Config.X_ACCEL_REDIRECT_PREFIX}/{folder}/{os.path.relpath(real, root)}")
+            return response
+    return _video_not_found(path)
+
+def _video_response(body, st, mime_type):
+    """Response over body with size and validators from st, after Range / 304 processing."""
+    response = Response(body, mimetype=mime_type, direct_passthrough=True)
+    response.content_length = st.st_size
+    response.last_modified = st.st_mtime
+    response.set_etag(f"{st.st_mtime_ns:x}-{st.st_size:x}")
+    response.make_conditional(request.environ, accept_ranges=True, complete_length=st.st_size)
+    return response
+
+def send_video_file(path, mime_type):
+    """Serve a video with Range and conditional-request support, from a single open()."""
+    if Config.X_ACCEL_REDIRECT_PREFIX:
+        response = _x_accel_redirect(path, mime_type)
+    elif Config.USE_X_SENDFILE:
+        # The proxy reads the file itself; only headers are built here
+        try:
+            response = send_file(path, mimetype=mime_type, as_attachment=False, conditional=True)
+        except FileNotFoundError:
+            return _video_not_found(path)
+    else:
+        # gunicorn's wrapper stops at Content-Length, so ranges can go through it directly
+        sendfile_ranges = ('wsgi.file_wrapper' in request.environ
+                           and request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn'))
+        # Without any server wrapper (the dev server), the body is sendfile()d to its socket instead
+        dev_socket = None if 'wsgi.file_wrapper' in request.environ else request.environ.get('werkzeug.socket')
+        # A server-provided wrapper (e.g. gunicorn's sendfile) wins; only the fallback is swapped
+        request.environ.setdefault('wsgi.file_wrapper', _chunked_file_wrapper)
+        if request.method == 'HEAD':
+            # Headers only (size checks by players and download managers): a stat answers it
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                return _video_not_found(path)
+            response = _video_response([], st, mime_type)
+        else:
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                return _video_not_found(path)
+            try:
+                # Size and validators come from the open handle, so there's no separate stat by path
+                st = os.fstat(f.fileno())
+                response = _video_response(request.environ['wsgi.file_wrapper'](f, STREAM_CHUNK_SIZE),
+                                           st, mime_type)
+            except BaseException:
+                f.close()
+                raise
+            if HAS_FADVISE:
+                if response.status_code == 206:
+                    _prefetch(f, response.content_range.start or 0, response.content_length or 0, st.st_size)
+                elif response.status_code == 200:
+                    _prefetch(f, 0, st.st_size, st.st_size)
+            if response.status_code == 206 and sendfile_ranges:
+                _sendfile_range(response, f)
+            elif dev_socket is not None and response.status_code in (200, 206):
+                offset = response.content_range.start if response.status_code == 206 else 0
+                response.response = _SocketSendfile(dev_socket, f, offset, response.content_length)
+    if request.args.get('v'):
+        # Versioned URL (?v=<video id>): a re-split that reuses a filename comes with a new
+        # video record, so the URL changes with the content and the browser never has to re-ask
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        # Unversioned: revalidate with the ETag / Last-Modified set above (304 when unchanged)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Players send many Range requests per playback; media files don't move once written,
+# so a filename's location is remembered briefly instead of re-probed (and re-walked) each time
+MEDIA_PATH_TTL = 60  # seconds
+# Misses are remembered too, briefly, so repeated 404 probes don't each re-walk the processed tree
+MEDIA_MISS_TTL = 5  # seconds
+MEDIA_PATH_CACHE_SIZE = 1024
+_media_path_cache = OrderedDict()  # filename -> (path or None, expires_at), least recent first
+_media_path_lock = threading.Lock()
+_media_path_inflight = {}  # filename -> (done event, [result]) for the lookup in progress
+
+# Canonical media roots (symlinks resolved) that served files must stay inside
+_MEDIA_ROOTS = tuple(os.path.realpath(d) for d in (Config.PROCESSED_FOLDER_ABS, Config.UPLOAD_FOLDER_ABS))
+
+def _canonical_media_path(path):
+    """Resolved path if it lies inside a media root, otherwise None."""
+    real = os.path.realpath(path)
+    if any(real.startswith(root + os.sep) for root in _MEDIA_ROOTS):
+        return real
+    return None
+
+def _find_media_path(filename):
+    for folder in (Config.PROCESSED_FOLDER, Config.UPLOAD_FOLDER):
+        p = os.path.join(folder, filename)
+        if os.path.isfile(p):
+            found_path = _canonical_media_path(p)
+            if found_path:
+                return found_path
+    
+    # Deep search in processed folder (for clips)
+    for root, dirs, files in os.walk(Config.PROCESSED_FOLDER):
+        if filename in files:
+            found_path = _canonical_media_path(os.path.join(root, filename))
+            if found_path:
+                return found_path
+    return None
+
+def resolve_media_path(filename):
+    """Find a media file in processed (including clip subfolders) or uploads; None if missing."""
+    # Only bare file names are accepted, so traversal attempts are rejected up front and
+    # never become cache keys
+    if not filename or filename in ('.', '..') or os.path.basename(filename) != filename:
+        return None
+    with _media_path_lock:
+        cached = _media_path_cache.get(filename)
+        if cached and cached[1] > time.monotonic():
+            _media_path_cache.move_to_end(filename)
+            return cached[0]
+        # A player opens playback with several range requests at once; only the first one on a
+        # cold name searches the folders, the rest wait for its answer
+        inflight = _media_path_inflight.get(filename)
+        owner = inflight is None
+        if owner:
+            inflight = _media_path_inflight[filename] = (threading.Event(), [None])
+    
+    done, result = inflight
+    if not owner:
+        done.wait()
+        return result[0]
+    
+    try:
+        found_path = result[0] = _find_media_path(filename)
+        # A file that appears after a miss is found once the short miss entry expires
+        ttl = MEDIA_PATH_TTL if found_path else MEDIA_MISS_TTL
+        with _media_path_lock:
+            _media_path_cache[filename] = (found_path, time.monotonic() + ttl)
+            _media_path_cache.move_to_end(filename)
+            if len(_media_path_cache) > MEDIA_PATH_CACHE_SIZE:
+                _media_path_cache.popitem(last=False)
+    finally:
+        with _media_path_lock:
+            _media_path_inflight.pop(filename, None)
+        done.set()
+    return found_path
+
+@lru_cache(maxsize=64)
+def _video_mime_type(ext):
+    """Content type for a file extension; anything not known as video is served as MP4."""
+    mime_type, _ = mimetypes.guess_type(f"file{ext}")
+    return mime_type if mime_type and mime_type.startswith('video/') else 'video/mp4'
+
+def video_mime_type(path):
+    return _video_mime_type(os.path.splitext(path)[1].lower())
+
 @api_bp.route('/caption/<project_id>/<filename>')
 def serve_caption(project_id, filename):
     filename = secure_filename(filename)
     file_path = os.path.join(Config.CAPTIONS_FOLDER, filename)
-    return send_file(file_path, as_attachment=True)
+    # send_file's own stat is the existence check; a missing file is a 404, not a 500
+    try:
+        return send_file(file_path, as_attachment=True)
+    except FileNotFoundError:
+        return jsonify({'error': 'Caption file not found'}), 404
 
 @api_bp.route('/video/<project_id>/<filename>')
 def serve_video(project_id, filename):
-    filename = secure_filename(filename)
-    
-    # Check possible locations
-    paths = [
-        os.path.join(Config.PROCESSED_FOLDER, filename),
-        os.path.join(Config.UPLOAD_FOLDER, filename),
-    ]
-    
-    # Also check any clips subdirectory in processed
-    found_path = None
-    for p in paths:
-        if os.path.exists(p):
-            found_path = p
-            break
-            
-    if not found_path:
-        # Detailed search in subdirectories if not found in root
-        for root, dirs, files in os.walk(Config.PROCESSED_FOLDER):
-            if filename in files:
-                found_path = os.path.join(root, filename)
-                break
-                
+    # resolve_media_path only accepts bare names inside the media folders, which is the whole check
+    found_path = resolve_media_path(filename)
     if not found_path:
         return jsonify({'error': 'Video file not found'}), 404
         
-    import mimetypes
-    mime_type, _ = mimetypes.guess_type(found_path)
-    if not mime_type or not mime_type.startswith('video/'):
-        mime_type = 'video/mp4'
-        
-    return send_file(found_path, mimetype=mime_type, as_attachment=False, conditional=True)
+    return send_video_file(found_path, video_mime_type(found_path))
 
 # --- Storage Management ---
 
@@ -461,9 +722,9 @@ def storage_files():
     files = []
     # Use absolute paths to ensure reliability
     dirs_to_check = [
-        ('uploads', os.path.abspath(Config.UPLOAD_FOLDER)),
-        ('processed', os.path.abspath(Config.PROCESSED_FOLDER)),
-        ('captions', os.path.abspath(Config.CAPTIONS_FOLDER))
+        ('uploads', Config.UPLOAD_FOLDER_ABS),
+        ('processed', Config.PROCESSED_FOLDER_ABS),
+        ('captions', Config.CAPTIONS_FOLDER_ABS)
     ]
     for dir_name, dir_path in dirs_to_check:
         if not os.path.exists(dir_path):
@@ -487,8 +748,8 @@ def storage_files():
 def list_staged_files():
     """List files in the storage area that could be imported (staged and general uploads)."""
     scan_dirs = [
-        ('Staged', os.path.join(Config.UPLOAD_FOLDER, 'browser_staged')),
-        ('Uploads', Config.UPLOAD_FOLDER)
+        ('Staged', os.path.join(Config.UPLOAD_FOLDER_ABS, 'browser_staged')),
+        ('Uploads', Config.UPLOAD_FOLDER_ABS)
     ]
     
     files = []
@@ -501,7 +762,7 @@ def list_staged_files():
         try:
             for f in os.listdir(dir_path):
                 p = os.path.join(dir_path, f)
-                abs_p = os.path.abspath(p)
+                abs_p = p  # dir_path is already absolute
                 
                 if os.path.isfile(p) and abs_p not in seen_paths:
                     # Only show video files
@@ -622,7 +883,7 @@ def storage_bulk_delete():
     for p in paths:
         abs_p = os.path.abspath(p)
         # Check safety
-        allowed = [os.path.abspath(Config.UPLOAD_FOLDER), os.path.abspath(Config.PROCESSED_FOLDER), os.path.abspath(Config.CAPTIONS_FOLDER)]
+        allowed = [Config.UPLOAD_FOLDER_ABS, Config.PROCESSED_FOLDER_ABS, Config.CAPTIONS_FOLDER_ABS]
         if any(abs_p.startswith(d) for d in allowed) and os.path.exists(abs_p):
             try:
                 os.remove(abs_p)
@@ -634,102 +895,37 @@ def storage_bulk_delete():
 def delete_file():
     data = request.get_json(force=True, silent=True) or {}
     file_path = data.get('path')
-    if not file_path or not os.path.exists(file_path):
+    if not file_path:
         return jsonify({'error': 'File not found'}), 404
     
     # Safety check: only allow files inside our app dirs
     allowed_dirs = [
-        os.path.abspath(Config.UPLOAD_FOLDER),
-        os.path.abspath(Config.PROCESSED_FOLDER),
-        os.path.abspath(Config.CAPTIONS_FOLDER)
+        Config.UPLOAD_FOLDER_ABS,
+        Config.PROCESSED_FOLDER_ABS,
+        Config.CAPTIONS_FOLDER_ABS
     ]
     abs_path = os.path.abspath(file_path)
     if not any(abs_path.startswith(d) for d in allowed_dirs):
         return jsonify({'error': 'Permission denied'}), 403
         
+    # The remove is the existence check; anything other than a missing file is a real 500
     try:
         os.remove(abs_path)
-        return jsonify({'success': True})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    except FileNotFoundError:
+        return jsonify({'error': 'File not found'}), 404
+    return jsonify({'success': True})
 
 @api_bp.route('/stream/<project_id>/<filename>')
 def stream_video(project_id, filename):
-    # Prevent directory traversal
-    filename = os.path.basename(filename)
-    
-    # Check possible locations
-    paths = [
-        os.path.join(Config.PROCESSED_FOLDER, filename),
-        os.path.join(Config.UPLOAD_FOLDER, filename),
-    ]
-    
-    found_path = None
-    for p in paths:
-        if os.path.exists(p):
-            found_path = p
-            break
-            
-    if not found_path:
-        # Deep search in processed folder (for clips)
-        for root, dirs, files in os.walk(Config.PROCESSED_FOLDER):
-            if filename in files:
-                found_path = os.path.join(root, filename)
-                break
-                
+    # Traversal is rejected by resolve_media_path (bare names inside the media folders only)
+    found_path = resolve_media_path(filename)
     if not found_path:
         logger.warning(f"Stream: File not found: {filename}")
         return jsonify({'error': 'Video file not found'}), 404
 
-    import mimetypes
-    mime_type, _ = mimetypes.guess_type(found_path)
-    if filename.lower().endswith('.mp4'):
-        mime_type = 'video/mp4'
-    elif not mime_type or not mime_type.startswith('video/'):
-        mime_type = 'video/mp4'
-
-    size = os.path.getsize(found_path)
-    range_header = request.headers.get('Range', None)
-
-    def _add_common_headers(res):
-        res.headers.add('Content-Disposition', 'inline')
-        res.headers.add('Accept-Ranges', 'bytes')
-        res.headers.add('X-Content-Type-Options', 'nosniff')
-        res.headers.add('Cache-Control', 'no-cache') # Don't cache during stream to avoid mixups
-        return res
-
-    if not range_header:
-        # Full file request
-        logger.info(f"Streaming full video (200): {found_path}")
-        response = send_file(found_path, mimetype=mime_type, as_attachment=False)
-        return _add_common_headers(response)
-
-    # Range request (Seeking)
-    try:
-        m = re.search(r'bytes=(\d+)-(\d*)', range_header)
-        if not m:
-            return send_file(found_path, mimetype=mime_type, as_attachment=False)
-
-        byte1, byte2 = m.groups()
-        byte1 = int(byte1)
-        byte2 = int(byte2) if byte2 else size - 1
-
-        if byte1 >= size:
-            return Response("Range Not Satisfiable", status=416)
-
-        length = byte2 - byte1 + 1
-        
-        # Read the requested chunk
-        with open(found_path, 'rb') as f:
-            f.seek(byte1)
-            data = f.read(length)
-
-        rv = Response(data, 206, mimetype=mime_type, direct_passthrough=True)
-        rv.headers.add('Content-Range', f'bytes {byte1}-{byte2}/{size}')
-        rv = _add_common_headers(rv)
-        rv.headers.add('Content-Length', str(length))
-        logger.debug(f"Streaming range {byte1}-{byte2} for {filename}")
-        return rv
-    except Exception as e:
-        logger.error(f"Error in range streaming for {filename}: {e}")
-        return send_file(found_path, mimetype=mime_type, as_attachment=False)
+    # Werkzeug answers Range requests (206 / 416, Accept-Ranges, Content-Range) straight from
+    # the file, instead of reading each range into memory
+    response = send_video_file(found_path, video_mime_type(found_path))
+    response.headers['Content-Disposition'] = 'inline'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
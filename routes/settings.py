@@ -4,7 +4,8 @@ API endpoints for cookie and proxy management
 from flask import Blueprint, request, jsonify, send_file
 from werkzeug.utils import secure_filename
 import os
-import json
+import shutil
+from utils.helpers import load_admin_config, save_admin_config
 
 settings_bp = Blueprint('settings', __name__, url_prefix='/api/settings')
 
@@ -14,9 +15,11 @@ def manage_cookies():
     cookies_path = os.path.join(os.getcwd(), 'cookies.txt')
     
     if request.method == 'GET':
-        # Check if cookies file exists
-        exists = os.path.exists(cookies_path)
-        size = os.path.getsize(cookies_path) if exists else 0
+        # Check if cookies file exists (one stat answers both questions)
+        try:
+            exists, size = True, os.stat(cookies_path).st_size
+        except FileNotFoundError:
+            exists, size = False, 0
         return jsonify({
             'exists': exists,
             'size': size,
@@ -32,27 +35,28 @@ def manage_cookies():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Save cookies file
-        file.save(cookies_path)
+        # Stream the upload to disk in 1MB chunks, then swap it in atomically
+        tmp_path = cookies_path + '.part'
+        with open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(file.stream, f, length=1 << 20)
+        os.replace(tmp_path, cookies_path)
         return jsonify({'message': 'Cookies uploaded successfully', 'path': 'cookies.txt'})
     
     elif request.method == 'DELETE':
         # Delete cookies file
-        if os.path.exists(cookies_path):
+        try:
             os.remove(cookies_path)
-            return jsonify({'message': 'Cookies deleted'})
-        return jsonify({'error': 'Cookies file not found'}), 404
+        except FileNotFoundError:
+            return jsonify({'error': 'Cookies file not found'}), 404
+        return jsonify({'message': 'Cookies deleted'})
 
 @settings_bp.route('/proxy', methods=['GET', 'POST'])
 def manage_proxy():
     """Manage proxy settings"""
-    config_path = os.path.join(os.getcwd(), 'admin_config.json')
-    
     if request.method == 'GET':
         # Load current proxy setting
         try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            config = load_admin_config()
             return jsonify({
                 'proxy': config.get('proxy', ''),
                 'proxy_enabled': config.get('proxy_enabled', False)
@@ -68,16 +72,14 @@ def manage_proxy():
         
         try:
             # Load existing config
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            config = load_admin_config()
         except:
             config = {}
         
         config['proxy'] = proxy
         config['proxy_enabled'] = proxy_enabled
         
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        save_admin_config(config)
         
         return jsonify({'message': 'Proxy settings saved', 'proxy': proxy, 'proxy_enabled': proxy_enabled})
 
@@ -87,15 +89,13 @@ def test_proxy():
     import time
     import requests
     
-    config_path = os.path.join(os.getcwd(), 'admin_config.json')
     proxy = None
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-            if config.get('proxy_enabled') and config.get('proxy'):
-                proxy = config['proxy'].strip()
-                if proxy and not proxy.startswith('http'):
-                    proxy = f'http://{proxy}'
+        config = load_admin_config()
+        if config.get('proxy_enabled') and config.get('proxy'):
+            proxy = config['proxy'].strip()
+            if proxy and not proxy.startswith('http'):
+                proxy = f'http://{proxy}'
     except:
         return jsonify({'error': 'Proxy not configured'}), 400
         
@@ -108,19 +108,24 @@ def test_proxy():
     stats = {}
     try:
         # Measure Latency (Ping)
-        start_time = time.time()
+        start_time = time.perf_counter()
         response = requests.get(test_url, proxies=proxies, timeout=10)
-        latency = (time.time() - start_time) * 1000 # ms
+        latency = (time.perf_counter() - start_time) * 1000 # ms
         stats['latency_ms'] = round(latency, 2)
         stats['status_code'] = response.status_code
         
         # Measure Download Speed (Small 1MB file or similar if available, or just headers)
         # Using a reliable CDN file for speed test
         speed_test_url = "https://ajax.googleapis.com/ajax/libs/jquery/3.6.0/jquery.min.js"
-        start_time = time.time()
-        response = requests.get(speed_test_url, proxies=proxies, timeout=15)
-        duration = time.time() - start_time
-        size_kb = len(response.content) / 1024
+        # Stream the body and count bytes as they arrive so we time the last byte
+        # without buffering the whole response in memory
+        total_bytes = 0
+        start_time = time.perf_counter()
+        with requests.get(speed_test_url, proxies=proxies, timeout=15, stream=True) as response:
+            for chunk in response.iter_content(chunk_size=65536):
+                total_bytes += len(chunk)
+        duration = time.perf_counter() - start_time
+        size_kb = total_bytes / 1024
         speed_kbps = size_kb / duration if duration > 0 else 0
         
         stats['download_speed_kbps'] = round(speed_kbps, 2)
@@ -8,6 +8,7 @@ import platform
 import subprocess
 import shutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from config import Config
 import numpy as np
@@ -41,6 +42,13 @@ class BrowserInstance:
     } catch(e) {}
     """
 
+    # Frames sent but not yet acknowledged by the client before new ones are held back
+    MAX_FRAMES_IN_FLIGHT = 2
+    # Treat outstanding frames as lost if the client stops acking for this long (seconds)
+    FRAME_ACK_TIMEOUT = 2.0
+    # Screencast only produces JPEG/PNG; frames are re-encoded to WebP (~30% smaller) before sending
+    FRAME_WEBP_QUALITY = 50
+
     def __init__(self, socket_id, socketio):
         self.socket_id = socket_id
         self.socketio = socketio
@@ -53,6 +61,13 @@ class BrowserInstance:
         self.display = None
         self._pointer_queue: Optional[asyncio.Queue] = None
         self._active_downloads = {}
+        # Single worker keeps frames in order while encoding/emitting off the event loop
+        self._frame_executor: Optional[ThreadPoolExecutor] = None
+        self._last_frame_hash = 0
+        self._frame_lock = threading.Lock()
+        self._frames_inflight = 0
+        self._last_frame_ack = time.monotonic()
+        self._pending_frame: Optional[str] = None
 
     def start(self, url="https://google.com"):
         if self.running and self.thread and self.thread.is_alive():
@@ -112,18 +127,15 @@ class BrowserInstance:
             # Load proxy from config if available
             proxy_config = None
             try:
-                import json
-                config_path = os.path.join(os.getcwd(), 'admin_config.json')
-                if os.path.exists(config_path):
-                    with open(config_path, 'r') as f:
-                        config = json.load(f)
-                        if config.get('proxy_enabled') and config.get('proxy'):
-                            proxy_str = config['proxy'].strip()
-                            if proxy_str:
-                                if not proxy_str.startswith('http'):
-                                    proxy_str = f'http://{proxy_str}'
-                                proxy_config = {'server': proxy_str}
-                                logger.info(f"Browser will launch with proxy: {proxy_str}")
+                from utils.helpers import load_admin_config
+                config = load_admin_config()
+                if config.get('proxy_enabled') and config.get('proxy'):
+                    proxy_str = config['proxy'].strip()
+                    if proxy_str:
+                        if not proxy_str.startswith('http'):
+                            proxy_str = f'http://{proxy_str}'
+                        proxy_config = {'server': proxy_str}
+                        logger.info(f"Browser will launch with proxy: {proxy_str}")
             except Exception as e:
                 logger.warning(f"Could not load proxy config: {e}")
 
@@ -215,28 +227,48 @@ class BrowserInstance:
 
             self.page.on("download", on_download)
 
-            async def streaming_task():
-                frame_count = 0
-                error_count = 0
-                while self.running:
-                    if not self.browser or not self.page or self.page.is_closed(): break
-                    try:
-                        screenshot = await self.page.screenshot(type='jpeg', quality=50)
-                        if screenshot:
-                            encoded = base64.b64encode(screenshot).decode('utf-8')
-                            self.socketio.emit('browser_frame', {'image': encoded}, room=self.socket_id)
-                            frame_count += 1
-                            if frame_count == 1:
-                                self.socketio.emit('browser_status', {'status': 'rendering'}, room=self.socket_id)
-                            if frame_count % 50 == 0:
-                                logger.info(f"Stream [ID:{self.socket_id}] - {frame_count} frames")
-                        await asyncio.sleep(0.12)
-                    except:
-                        error_count += 1
-                        if error_count > 30: break
-                        await asyncio.sleep(1)
-
-            stream_job = asyncio.create_task(streaming_task())
+            # Chromium pushes a JPEG whenever the compositor produces a new frame, so a static
+            # page generates no captures at all; no per-frame round trips or paint tracking needed
+            loop = asyncio.get_running_loop()
+            frame_count = 0
+
+            async def on_screencast_frame(params):
+                nonlocal frame_count
+                # Leaving a frame un-acked pauses the screencast once the session is stopping
+                if not self.running:
+                    return
+                try:
+                    await cdp.send('Page.screencastFrameAck', {'sessionId': params['sessionId']})
+                except Exception as e:
+                    logger.debug(f"Screencast ack failed for {self.socket_id}: {e}")
+                    return
+                # Repaints often produce a byte-identical JPEG (cursor blink, idle page); don't resend it
+                frame_hash = hash(params['data'])
+                if frame_hash == self._last_frame_hash:
+                    return
+                self._last_frame_hash = frame_hash
+                if not self._reserve_frame_slot():
+                    # Client is behind: keep only the newest frame, it goes out on the next ack
+                    self._pending_frame = params['data']
+                    return
+                # Don't await: Chromium renders the next frame while this one is sent
+                loop.run_in_executor(self._frame_executor, self._emit_frame, params['data'])
+                frame_count += 1
+                if frame_count == 1:
+                    self.socketio.emit('browser_status', {'status': 'rendering'}, room=self.socket_id)
+                if frame_count % 50 == 0:
+                    logger.info(f"Stream [ID:{self.socket_id}] - {frame_count} frames")
+
+            self._frame_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"frames-{self.socket_id}")
+            cdp = await self.context.new_cdp_session(self.page)
+            cdp.on('Page.screencastFrame', on_screencast_frame)
+            await cdp.send('Page.startScreencast', {
+                'format': 'jpeg',
+                'quality': 50,
+                'maxWidth': 1280,
+                'maxHeight': 720,
+                'everyNthFrame': 2
+            })
             
             logger.info(f"Navigating to {url}...")
             try:
@@ -268,10 +300,55 @@ class BrowserInstance:
             logger.info("Browser session ending.")
 
             logger.info("Closing browser - all tasks finished.")
-            stream_job.cancel()
+            try:
+                await cdp.send('Page.stopScreencast')
+            except Exception:
+                pass
+            self._frame_executor.shutdown(wait=False)
             if self.browser:
                 await self.browser.close()
 
+    def _emit_frame(self, data: str):
+        """Decode a screencast frame and push it to the client as a binary event (runs in the frame executor)."""
+        image, mime = self._encode_frame(base64.b64decode(data))
+        self.socketio.emit('browser_frame', {'image': image, 'mime': mime}, room=self.socket_id, callback=self._on_frame_ack)
+
+    def _encode_frame(self, jpeg: bytes):
+        """Re-encode a JPEG frame as WebP, keeping the JPEG if that fails or isn't smaller."""
+        try:
+            pixels = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            ok, webp = cv2.imencode('.webp', pixels, [cv2.IMWRITE_WEBP_QUALITY, self.FRAME_WEBP_QUALITY])
+            if ok and len(webp) < len(jpeg):
+                return webp.tobytes(), 'image/webp'
+        except Exception as e:
+            logger.debug(f"WebP frame encode failed, sending JPEG: {e}")
+        return jpeg, 'image/jpeg'
+
+    def _reserve_frame_slot(self) -> bool:
+        """Claim an in-flight slot for a frame, or return False if the client is backed up."""
+        with self._frame_lock:
+            now = time.monotonic()
+            if self._frames_inflight >= self.MAX_FRAMES_IN_FLIGHT:
+                if now - self._last_frame_ack < self.FRAME_ACK_TIMEOUT:
+                    return False
+                # Acks stopped arriving; don't stall the stream forever
+                self._frames_inflight = 0
+                self._last_frame_ack = now
+            self._frames_inflight += 1
+            return True
+
+    def _on_frame_ack(self, *args):
+        """Client received a frame: free its slot and flush any frame held back."""
+        with self._frame_lock:
+            self._frames_inflight = max(0, self._frames_inflight - 1)
+            self._last_frame_ack = time.monotonic()
+            pending, self._pending_frame = self._pending_frame, None
+        if pending and self._frame_executor and self._reserve_frame_slot():
+            try:
+                self._frame_executor.submit(self._emit_frame, pending)
+            except RuntimeError:
+                pass  # Session already shut down
+
     async def _pointer_loop(self):
         """Consume pointer events with low latency"""
         while self.running:
@@ -1,166 +1,430 @@
 import os
+import shutil
+import bisect
+import hashlib
 import threading
 import logging
 import subprocess
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from functools import lru_cache
 from typing import List
+import ctranslate2
 from faster_whisper import WhisperModel
 from config import Config
-from utils.helpers import thread_safe_status_update, retry_on_failure
+from utils.helpers import thread_safe_status_update, retry_on_failure, get_h264_encoder, h264_device_args, hwaccel_args, h264_encoder_args, h264_video_args, run_h264_encode, probe_video, probe_duration
 
 logger = logging.getLogger(__name__)
-whisper_models = {}
+
+# Batched inference needs faster-whisper >= 1.1; older installs transcribe sequentially
+try:
+    from faster_whisper import BatchedInferencePipeline
+    HAS_BATCHED_PIPELINE = True
+except ImportError:
+    HAS_BATCHED_PIPELINE = False
+
+# Cross-file batching packs several files' speech into one batched pass (same faster-whisper release)
+try:
+    import numpy as np
+    from faster_whisper import decode_audio
+    from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
+    HAS_CROSS_FILE_BATCH = HAS_BATCHED_PIPELINE
+except ImportError:
+    HAS_CROSS_FILE_BATCH = False
+
+SAMPLE_RATE = 16000
+whisper_workers = {}
+_whisper_lock = threading.Lock()
+
+def resolve_whisper_device():
+    """Pick (device, compute_type) for faster-whisper, preferring quantized weights."""
+    device = Config.WHISPER_DEVICE
+    if device == 'auto':
+        device = 'cuda' if ctranslate2.get_cuda_device_count() > 0 else 'cpu'
+    compute_type = Config.WHISPER_COMPUTE_TYPE
+    if compute_type == 'auto':
+        compute_type = 'float16' if device == 'cuda' else 'int8'
+    return device, compute_type
+
+class WhisperWorker:
+    """A loaded WhisperModel with a single thread that all transcriptions for it run on."""
+
+    def __init__(self, size: str):
+        self.size = size
+        device, compute_type = resolve_whisper_device()
+        logger.info(f"Loading Whisper '{size}' on {device} ({compute_type})")
+        model_kwargs = dict(
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=os.cpu_count() or 0,
+            num_workers=1,
+            download_root=Config.MODEL_CACHE_DIR
+        )
+        try:
+            # Cached weights load without a hub round-trip; only a first run downloads
+            self.model = WhisperModel(size, local_files_only=True, **model_kwargs)
+        except Exception:
+            self.model = WhisperModel(size, **model_kwargs)
+        # Batches the 30s windows of a file through the encoder/decoder together
+        self.pipeline = BatchedInferencePipeline(model=self.model) if HAS_BATCHED_PIPELINE else None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"whisper-{size}")
+
+    def _transcribe(self, audio, kwargs):
+        if self.pipeline is not None:
+            segments, info = self.pipeline.transcribe(audio, batch_size=Config.WHISPER_BATCH_SIZE, **kwargs)
+        else:
+            segments, info = self.model.transcribe(audio, **kwargs)
+        # Segments are decoded lazily; drain them on the worker thread
+        return list(segments), info
+
+    def transcribe(self, audio, **kwargs):
+        """Queue a transcription behind any in-flight ones and wait for the result."""
+        return self._executor.submit(self._transcribe, audio, kwargs).result()
+
+    def warm_up(self):
+        """Run one second of silence through the model so CUDA kernels and workspaces are set up before a real job."""
+        import numpy
+        silence = numpy.zeros(SAMPLE_RATE, dtype=numpy.float32)
+        # VAD would drop the silence before it reached the model
+        self.transcribe(silence, vad_filter=False, without_timestamps=True)
+
+    def _transcribe_many(self, paths, word_level):
+        vad_options = VadOptions(min_silence_duration_ms=Config.WHISPER_VAD_MIN_SILENCE_MS)
+        # Language is fixed per pass, so files are grouped by their detected language first
+        by_language = {}
+        for index, path in enumerate(paths):
+            audio = decode_audio(path, sampling_rate=SAMPLE_RATE)
+            language, _, _ = self.model.detect_language(audio, vad_filter=True)
+            by_language.setdefault(language, []).append((index, audio))
+
+        results = [[] for _ in paths]
+        for language, items in by_language.items():
+            # Concatenate the files and hand the pipeline each file's speech regions as clips,
+            # so windows from different files share encoder/decoder batches
+            clips, offsets, offset = [], [], 0
+            for _, audio in items:
+                offsets.append(offset / SAMPLE_RATE)
+                for chunk in merge_segments(get_speech_timestamps(audio, vad_options), vad_options):
+                    clips.append({'start': (offset + chunk['start']) / SAMPLE_RATE, 'end': (offset + chunk['end']) / SAMPLE_RATE})
+                offset += len(audio)
+            if not clips:
+                continue
+            segments, _ = self.pipeline.transcribe(
+                np.concatenate([audio for _, audio in items]),
+                language=language,
+                clip_timestamps=clips,
+                word_timestamps=word_level,
+                batch_size=Config.WHISPER_BATCH_SIZE
+            )
+            for seg in segments:
+                slot = bisect.bisect_right(offsets, seg.start) - 1
+                results[items[slot][0]].append(shift_segment(seg, -offsets[slot]))
+        return results
+
+    def transcribe_many(self, paths, word_level):
+        """Transcribe several files in shared batched passes, returning a segment list per file."""
+        return self._executor.submit(self._transcribe_many, paths, word_level).result()
+
+def get_whisper_worker(size: str) -> WhisperWorker:
+    """Load and cache the transcription worker for a model size."""
+    size = size or Config.WHISPER_MODEL_DEFAULT
+    worker = whisper_workers.get(size)
+    if worker is not None:
+        return worker
+    # Double-checked so concurrent cold starts load each model exactly once
+    with _whisper_lock:
+        worker = whisper_workers.get(size)
+        if worker is None:
+            worker = WhisperWorker(size)
+            whisper_workers[size] = worker
+    return worker
+
+def init_whisper(default_size: str = None):
+    """Load and warm the default model in the background so the first caption job doesn't pay the cold start."""
+    def _warm():
+        try:
+            get_whisper_worker(default_size).warm_up()
+            logger.info("Whisper model preloaded")
+        except Exception as e:
+            logger.warning(f"Whisper preload failed: {e}")
+    threading.Thread(target=_warm, name="whisper-preload", daemon=True).start()
 
 def get_whisper_model(size: str) -> WhisperModel:
     """Load and cache faster-whisper model."""
-    size = size or Config.WHISPER_MODEL_DEFAULT
-    if size not in whisper_models:
-        whisper_models[size] = WhisperModel(size, device="auto", compute_type="auto")
-    return whisper_models[size]
+    return get_whisper_worker(size).model
 
-def write_srt(segments, path: str, word_level: bool):
-    """Write segments/words to SRT file."""
-    def format_ts(t):
-        hrs = int(t // 3600)
-        mins = int((t % 3600) // 60)
-        secs = int(t % 60)
-        millis = int((t - int(t)) * 1000)
-        return f"{hrs:02}:{mins:02}:{secs:02},{millis:03}"
-
-    lines: List[str] = []
-    idx = 1
+# Built once; VAD drops silent stretches before they reach the encoder
+TRANSCRIBE_KWARGS = {
+    'vad_filter': Config.WHISPER_VAD,
+    **({'vad_parameters': {'min_silence_duration_ms': Config.WHISPER_VAD_MIN_SILENCE_MS}} if Config.WHISPER_VAD else {}),
+}
+
+def transcribe_audio(path: str, word_level: bool, size: str = None):
+    """Transcribe a media file with VAD, returning (segments, info)."""
+    return get_whisper_worker(size).transcribe(path, word_timestamps=word_level, **TRANSCRIBE_KWARGS)
+
+def transcribe_batch(paths: List[str], word_level: bool, size: str = None):
+    """Transcribe several media files together, returning a segment list per file."""
+    worker = get_whisper_worker(size)
+    if len(paths) > 1 and worker.pipeline is not None and HAS_CROSS_FILE_BATCH:
+        return worker.transcribe_many(paths, word_level)
+    return [transcribe_audio(path, word_level, size)[0] for path in paths]
+
+def shift_segment(seg, delta: float):
+    """Move a segment (and its words) along the timeline by delta seconds."""
+    words = [replace(w, start=w.start + delta, end=w.end + delta) for w in seg.words] if seg.words else seg.words
+    return replace(seg, start=seg.start + delta, end=seg.end + delta, words=words)
+
+def format_ts(t):
+    """Format seconds as an SRT timestamp (HH:MM:SS,mmm)."""
+    ti = int(t)
+    hrs, rem = divmod(ti, 3600)
+    mins, secs = divmod(rem, 60)
+    return f"{hrs:02}:{mins:02}:{secs:02},{int((t - ti) * 1000):03}"
+
+def iter_caption_events(segments, word_level: bool):
+    """Yield (start, end, text) for each non-empty segment or word."""
     if word_level:
-        for seg in segments:
-            for w in seg.words:
-                start, end, text = w.start, w.end, w.word.strip()
-                if not text:
-                    continue
-                lines.append(str(idx))
-                lines.append(f"{format_ts(start)} --> {format_ts(end)}")
-                lines.append(text.upper())
-                lines.append("")
-                idx += 1
+        entries = ((w.start, w.end, w.word) for seg in segments for w in seg.words)
     else:
-        for seg in segments:
-            start, end, text = seg.start, seg.end, seg.text.strip()
-            if not text:
-                continue
-            lines.append(str(idx))
-            lines.append(f"{format_ts(start)} --> {format_ts(end)}")
-            lines.append(text.upper())
-            lines.append("")
-            idx += 1
+        entries = ((seg.start, seg.end, seg.text) for seg in segments)
+    for start, end, text in entries:
+        text = text.strip()
+        if text:
+            yield start, end, text
+
+def iter_srt_blocks(segments, word_level: bool):
+    """Yield numbered SRT blocks, separated by blank lines."""
+    for index, (start, end, text) in enumerate(iter_caption_events(segments, word_level), 1):
+        sep = "\n" if index > 1 else ""
+        yield f"{sep}{index}\n{format_ts(start)} --> {format_ts(end)}\n{text.upper()}\n"
+
+def write_srt(segments, path: str, word_level: bool):
+    """Write segments/words to SRT file."""
+    # writelines drains the generator in C into a 1 MiB buffer: a handful of write syscalls
+    # per file, without holding the whole transcript in memory
+    with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.writelines(iter_srt_blocks(segments, word_level))
+
+# UI font names mapped to the TTF files shipped in fonts/ (resolved by fontconfig at burn time)
+FONT_MAP = {
+    'Montserrat': 'Montserrat-Bold.ttf',
+    'Lobster': 'Lobster-Regular.ttf',
+    'Poppins': 'Poppins-Bold.ttf',
+    'Bangers': 'Bangers-Regular.ttf',
+    'Luckiest Guy': 'LuckiestGuy-Regular.ttf',
+    'Anton': 'Anton-Regular.ttf',
+    'Bebas Neue': 'BebasNeue-Regular.ttf',
+    'Titan One': 'TitanOne-Regular.ttf',
+}
+
+# UI alignment -> ASS alignment: 1-3 (Bottom), 4-6 (Middle), 7-9 (Top)
+ASS_ALIGNMENT_MAP = {'2': '2', '10': '5', '6': '8'}
+
+ASS_HEADER_TEMPLATE = "\n".join([
+    "[Script Info]",
+    "ScriptType: v4.00+",
+    "PlayResX: 1920",
+    "PlayResY: 1080",
+    "ScaledBorderAndShadow: yes",
+    "",
+    "[V4+ Styles]",
+    "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+    "Style: Default,{font_name},{font_size},{primary},&H000000FF,{outline},{back},-1,0,0,0,100,100,0,0,{border_style},{outline_val},{shadow_val},{alignment},20,20,40,1",
+    "",
+    "[Events]",
+    "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+]).format
 
-    with open(path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+FORCE_STYLE_TEMPLATE = "FontName={font_name},FontSize={font_size},PrimaryColour={primary},OutlineColour={outline},Outline={outline_width},Shadow={shadow},Bold=-1".format
 
+@lru_cache(maxsize=64)
 def to_ass_color(hex_color):
     """Convert hex (#RRGGBB) to ASS color format (&HAABBGGRR)."""
     if not hex_color: return "&H00FFFFFF"
     hex_val = hex_color.replace('#', '')
     if len(hex_val) == 6:
-        r, g, b = hex_val[:2], hex_val[2:4], hex_val[4:6]
-        return f"&H00{b}{g}{r}"
+        try:
+            v = int(hex_val, 16)
+        except ValueError:
+            return "&HA0000000"
+        return f"&H00{v & 0xFF:02X}{(v >> 8) & 0xFF:02X}{(v >> 16) & 0xFF:02X}"
     return "&HA0000000" # Default semi-transparent black for backgrounds
 
-def srt_to_ass_time(srt_time):
-    """Convert SRT timestamp (00:00:00,000) to ASS timestamp (0:00:00.00)."""
+def parse_srt_ts(ts):
+    """Parse an SRT timestamp (00:00:00,000) into seconds."""
+    h, m, s = ts.strip().replace(',', '.').split(':')
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+def format_ass_ts(t):
+    """Format seconds as an ASS timestamp (0:00:00.00)."""
+    secs, ms = divmod(int(round(t * 1000)), 1000)
+    hrs, rem = divmod(secs, 3600)
+    mins, secs = divmod(rem, 60)
+    return f"{hrs}:{mins:02}:{secs:02}.{ms // 10:02}"
+
+def iter_srt_events(srt_path):
+    """Stream (start, end, text) events out of an SRT file one block at a time."""
+    if not os.path.exists(srt_path):
+        return
+    block = []
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                block.append(line)
+                continue
+            if block:
+                yield from _srt_block_event(block)
+                block = []
+    if block:
+        yield from _srt_block_event(block)
+
+def _srt_block_event(lines):
+    # Line 0 is index, Line 1 is timestamps, Line 2+ is text
+    if len(lines) < 3 or ' --> ' not in lines[1]:
+        return
+    start, end = lines[1].split(' --> ', 1)
     try:
-        h, m, s = srt_time.split(':')
-        s_sec, s_ms = s.split(',')
-        h_int = int(h)
-        ms_cs = s_ms[:2]
-        return f"{h_int}:{m}:{s_sec}.{ms_cs}"
-    except:
-        return "0:00:00.00"
+        yield parse_srt_ts(start), parse_srt_ts(end), " ".join(lines[2:])
+    except ValueError:
+        logger.warning(f"Skipping malformed SRT timing: {lines[1]}")
 
-def create_ass_file(srt_path, style):
-    """Convert SRT to ASS with embedded styling and font attachments."""
-    font_name_ui = style.get('fontName', 'Arial Black')
-    font_size = int(style.get('fontSize', 32))
-    primary = to_ass_color(style.get('primaryColor', '#ffffff'))
-    outline = to_ass_color(style.get('outlineColor', '#000000'))
-    back = to_ass_color(style.get('backgroundColor', '#000000'))
-    
-    # Map UI font names to actual TTF files
-    font_map = {
-        'Montserrat': 'Montserrat-Bold.ttf',
-        'Lobster': 'Lobster-Regular.ttf',
-        'Poppins': 'Poppins-Bold.ttf',
-        'Bangers': 'Bangers-Regular.ttf',
-        'Luckiest Guy': 'LuckiestGuy-Regular.ttf',
-        'Anton': 'Anton-Regular.ttf',
-        'Bebas Neue': 'BebasNeue-Regular.ttf',
-        'Titan One': 'TitanOne-Regular.ttf',
-    }
-    
-    # Get the actual font file or fallback to Arial
-    font_file = font_map.get(font_name_ui, None)
-    fonts_dir = os.path.join(os.getcwd(), 'fonts')
-    
-    # Use font name - FFmpeg will find it via fontconfig
-    font_name = font_name_ui
-    
-    # ASS Standard Alignment: 1-3 (Bottom), 4-6 (Middle), 7-9 (Top)
-    ui_alignment = str(style.get('alignment', '2'))
-    mapping = {'2': '2', '10': '5', '6': '8'}
-    ass_alignment = mapping.get(ui_alignment, '2')
+@lru_cache(maxsize=32)
+def ass_style_header(font_name, font_size, primary, outline, back, border_style, shadow_val, alignment):
+    """Render the ASS header for one style combination; repeat styles reuse it."""
+    return ASS_HEADER_TEMPLATE(
+        font_name=font_name,
+        font_size=font_size,
+        primary=to_ass_color(primary),
+        outline=to_ass_color(outline),
+        back=to_ass_color(back),
+        border_style=border_style,
+        outline_val=4 if border_style == '1' else 0,  # Thick outline for readability
+        shadow_val=shadow_val,
+        alignment=ASS_ALIGNMENT_MAP.get(alignment, '2')
+    )
 
-    border_style = style.get('borderStyle', '1')
-    outline_val = 4 if border_style == '1' else 0  # Thick outline for readability
-    
+def iter_ass_dialogue(events):
+    """Yield an ASS Dialogue line for each (start, end, text) event."""
+    for start, end, text in events:
+        # Force uppercase for viral impact if it fits the style
+        text = text.replace('"', '""').upper()
+        yield f"\nDialogue: 0,{format_ass_ts(start)},{format_ass_ts(end)},Default,,0,0,0,,{text}"
+
+def write_ass(events, path, style):
+    """Write caption events to an ASS file with embedded styling."""
     try:
         shadow_val = int(style.get('shadowBlur', 6))
     except:
         shadow_val = 6
     
-    bold = -1  # Force bold
-    
-    ass_content = [
-        "[Script Info]",
-        "ScriptType: v4.00+",
-        "PlayResX: 1920",
-        "PlayResY: 1080",
-        "ScaledBorderAndShadow: yes",
-        "",
-        "[V4+ Styles]",
-        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
-        f"Style: Default,{font_name},{font_size},{primary},&H000000FF,{outline},{back},{bold},0,0,0,100,100,0,0,{border_style},{outline_val},{shadow_val},{ass_alignment},20,20,40,1",
-        "",
-        "[Events]",
-        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
-    ]
-    
-    if os.path.exists(srt_path):
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-            
-        blocks = content.split('\n\n')
-        for block in blocks:
-            lines = [l.strip() for l in block.split('\n') if l.strip()]
-            if len(lines) >= 3:
-                # Line 0 is index, Line 1 is timestamps, Line 2+ is text
-                time_line = lines[1]
-                if ' --> ' in time_line:
-                    times = time_line.split(' --> ')
-                    start = srt_to_ass_time(times[0])
-                    end = srt_to_ass_time(times[1])
-                    text = " ".join(lines[2:]).replace('"', '""')
-                    # Force uppercase for viral impact if it fits the style
-                    text = text.upper()
-                    ass_content.append(f"Dialogue: 0,{start},{end},Default,,0,0,0,,{text}")
-                
-    ass_path = srt_path.replace('.srt', '.ass')
-    with open(ass_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(ass_content))
-        
-    return ass_path
+    header = ass_style_header(
+        style.get('fontName', 'Arial Black'),
+        int(style.get('fontSize', 32)),
+        style.get('primaryColor', '#ffffff'),
+        style.get('outlineColor', '#000000'),
+        style.get('backgroundColor', '#000000'),
+        style.get('borderStyle', '1'),
+        shadow_val,
+        str(style.get('alignment', '2'))
+    )
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write(header)
+        f.writelines(iter_ass_dialogue(events))
+    return path
+
+def create_ass_file(srt_path, style):
+    """Convert SRT to ASS with embedded styling and font attachments."""
+    return write_ass(iter_srt_events(srt_path), srt_path.replace('.srt', '.ass'), style)
+
+@lru_cache(maxsize=32)
+def resolve_font_family(font_name: str) -> str:
+    """Check a caption font against fontconfig before FFmpeg runs, returning the family libass will use."""
+    try:
+        result = subprocess.run(['fc-match', '-f', '%{family}', font_name], capture_output=True, text=True, timeout=5)
+    except Exception:
+        return font_name
+    families = result.stdout.strip()
+    if result.returncode != 0 or not families:
+        return font_name
+    if font_name.lower() not in families.lower():
+        substitute = families.split(',')[0]
+        logger.warning(f"Font '{font_name}' not installed, substituting '{substitute}'")
+        return substitute
+    return font_name
 
-@retry_on_failure(max_retries=2, delay=2)
-def burn_captions(video_path, srt_path, output_path, status_key, style=None):
+BURN_CACHE_DIR = Config.BURN_CACHE_DIR
+
+def burn_cache_key(video_path, ass_path, encode_args) -> str:
+    """Key a burn on the source file identity, the rendered ASS and the encode settings."""
+    st = os.stat(video_path)
+    h = hashlib.sha1(f"{os.path.abspath(video_path)}|{st.st_mtime_ns}|{st.st_size}".encode('utf-8'))
+    with open(ass_path, 'rb') as f:
+        h.update(f.read())
+    h.update("\0".join(encode_args).encode('utf-8'))
+    return h.hexdigest()
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a copy across filesystems."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def prune_burn_cache(max_bytes=None):
+    """Evict the least recently used cached burns until the cache fits under BURN_CACHE_MAX_MB."""
+    max_bytes = Config.BURN_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    entries = []
+    try:
+        with os.scandir(BURN_CACHE_DIR) as it:
+            for entry in it:
+                if entry.is_file():
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except FileNotFoundError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError as e:
+            logger.warning(f"Could not evict cached burn {path}: {e}")
+
+def gpu_blend_args(video_path, subtitles_filter):
+    """Render captions onto a transparent canvas with libass and composite them on the GPU with overlay_cuda."""
+    try:
+        stream = next((s for s in probe_video(video_path).get('streams', []) if s.get('codec_type') == 'video'), None)
+    except Exception as e:
+        logger.warning(f"Could not probe {video_path} for GPU blending: {e}")
+        return None
+    if not stream or not stream.get('width') or not stream.get('height'):
+        return None
+    rate = stream.get('avg_frame_rate') or stream.get('r_frame_rate') or '0/0'
+    if rate.startswith('0'):
+        return None
+    canvas = f"color=c=black@0:s={stream['width']}x{stream['height']}:r={rate}"
+    # With hardware decode the source already sits in CUDA memory (-hwaccel_output_format cuda)
+    bg = "[0:v]" if Config.HWACCEL_DECODE else "[0:v]format=nv12,hwupload_cuda[bg];[bg]"
+    graph = (
+        f"[1:v]format=rgba,{subtitles_filter}:alpha=1,format=yuva420p,hwupload_cuda[fg];"
+        f"{bg}[fg]overlay_cuda=shortest=1[v]"
+    )
+    return ['-f', 'lavfi', '-i', canvas], ['-filter_complex', graph, '-map', '[v]', '-map', '0:a?']
+
+@retry_on_failure(max_retries=2, delay=2, retry_kwargs={'fast_retry': True})
+def burn_captions(video_path, srt_path, output_path, status_key, style=None, pre_filter=None, fast_retry=False):
     """
     Professional caption burning logic.
     Converts SRT to styled ASS format for bulletproof rendering.
+    pre_filter (e.g. an aspect crop/scale) runs ahead of the subtitles in the same encode.
+    fast_retry trades quality for a much quicker rerun after a failed attempt.
     """
     try:
         thread_safe_status_update(status_key, {'status': 'burning', 'progress': 20})
@@ -174,42 +438,74 @@ def burn_captions(video_path, srt_path, output_path, status_key, style=None):
         ass_path_for_ffmpeg = ass_path.replace('\\', '/').replace(':', '\\\\:')
         
         # Extract style parameters
-        font_name = style.get('fontName', 'Arial Black')
+        font_name = resolve_font_family(style.get('fontName', 'Arial Black'))
         font_size = int(style.get('fontSize', 32))
-        primary_color = style.get('primaryColor', '#ffffff')
-        outline_color = style.get('outlineColor', '#000000')
         border_style = style.get('borderStyle', '1')
         
-        # Convert colors to ASS format for force_style
-        primary_ass = to_ass_color(primary_color).replace('&H', '&H')
-        outline_ass = to_ass_color(outline_color).replace('&H', '&H')
-        
         # Build force_style string for maximum compatibility
-        outline_width = 4 if border_style == '1' else 0
-        shadow = int(style.get('shadowBlur', 6))
-        
-        force_style = f"FontName={font_name},FontSize={font_size},PrimaryColour={primary_ass},OutlineColour={outline_ass},Outline={outline_width},Shadow={shadow},Bold=-1"
+        force_style = FORCE_STYLE_TEMPLATE(
+            font_name=font_name,
+            font_size=font_size,
+            primary=to_ass_color(style.get('primaryColor', '#ffffff')),
+            outline=to_ass_color(style.get('outlineColor', '#000000')),
+            outline_width=4 if border_style == '1' else 0,
+            shadow=int(style.get('shadowBlur', 6))
+        )
         
         logger.info(f"Burning captions | Font: {font_name} {font_size}px | Style: {force_style}")
         
         # Use subtitles filter with force_style for better font support
         vf = f"subtitles='{ass_path_for_ffmpeg}':force_style='{force_style}'"
+        if pre_filter:
+            vf = f"{pre_filter},{vf}"
 
-        cmd = [
-            'ffmpeg', '-i', video_path,
-            '-vf', vf,
-            '-c:v', 'libx264', '-preset', 'medium', '-crf', '20',
-            '-c:a', 'copy',
-            '-y', output_path
-        ]
-        
-        logger.info(f"FFmpeg command: {' '.join(cmd)}")
-        result = subprocess.run(cmd, check=False, capture_output=True, text=True)
+        # Subtitle timing rules out resuming from fragments, so a retry re-encodes everything, just cheaper
+        crf, preset = (28, 'veryfast') if fast_retry else (20, 'medium')
+
+        gpu_blend = None
+        if Config.GPU_SUBTITLE_BLEND and not pre_filter and get_h264_encoder() == 'h264_nvenc':
+            gpu_blend = gpu_blend_args(video_path, vf)
+
+        def build_cmd(encoder):
+            if encoder == 'h264_nvenc' and gpu_blend:
+                inputs, graph = gpu_blend
+                return [
+                    'ffmpeg', *hwaccel_args(encoder, keep_on_gpu=True), '-i', video_path, *inputs, *graph,
+                    *h264_encoder_args(encoder, crf=crf, preset=preset), '-c:a', 'copy', '-movflags', '+faststart', '-y', output_path
+                ]
+            cmd = [
+                'ffmpeg', *h264_device_args(encoder), *hwaccel_args(encoder), '-i', video_path,
+                *h264_video_args(encoder, vf, crf=crf, preset=preset),
+            ]
+            return cmd + ['-c:a', 'copy', '-movflags', '+faststart', '-y', output_path]
+
+        cmd = build_cmd(get_h264_encoder())
         
-        if result.returncode != 0:
-            logger.error(f"FFmpeg STDERR: {result.stderr}")
-            logger.error(f"FFmpeg STDOUT: {result.stdout}")
-            raise Exception(f"FFmpeg caption burn failed: {result.stderr}")
+        # Re-burning the same captions/style onto the same source reuses the earlier encode
+        cache_path = os.path.join(BURN_CACHE_DIR, f"{burn_cache_key(video_path, ass_path, cmd[:-1])}.mp4")
+        if os.path.exists(cache_path):
+            logger.info(f"Reusing cached burn: {cache_path}")
+            link_or_copy(cache_path, output_path)
+            # Hits refresh the mtime so eviction drops the least recently used burns first
+            try: os.utime(cache_path)
+            except OSError: pass
+        else:
+            logger.info(f"FFmpeg command: {' '.join(cmd)}")
+            result = run_h264_encode(build_cmd, status_key=status_key, duration=probe_duration(video_path), progress_range=(20, 90))
+            
+            if result.returncode != 0:
+                logger.error(f"FFmpeg STDERR: {result.stderr}")
+                raise Exception(f"FFmpeg caption burn failed: {result.stderr}")
+            # libass font warnings still exit 0; only an empty output means the burn didn't happen
+            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+                raise Exception("FFmpeg caption burn produced no output")
+
+            try:
+                os.makedirs(BURN_CACHE_DIR, exist_ok=True)
+                link_or_copy(output_path, cache_path)
+                prune_burn_cache()
+            except OSError as e:
+                logger.warning(f"Could not cache burn output: {e}")
 
         # Cleanup temporary ASS file
         if os.path.exists(ass_path):
@@ -1,4 +1,5 @@
 import os
+import sys
 import uuid
 import time
 import shutil
@@ -7,7 +8,9 @@ import tempfile
 import yt_dlp
 import requests
 import subprocess
-import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timezone
 from scenedetect import ContentDetector, AdaptiveDetector, SceneManager, open_video
 from config import Config
@@ -16,11 +19,67 @@ from utils.helpers import (
     detect_platform, 
     update_progress,
     ensure_project_dirs,
-    retry_on_failure
+    retry_on_failure,
+    h264_device_args,
+    hwaccel_args,
+    h264_video_args,
+    run_h264_encode,
+    run_ffmpeg,
+    probe_video,
+    aac_audio_args,
+    probe_duration
 )
 
 logger = logging.getLogger(__name__)
 
+# Shared ffmpeg argument blocks
+STREAM_COPY_ARGS = ('-map', '0:v:0', '-map', '0:a?', '-c', 'copy')  # first video + any audio, no re-encode
+AAC_192K_ARGS = ('-c:a', 'aac', '-b:a', '192k')  # trims re-encode so audio cuts land exactly on the seek point
+
+@lru_cache(maxsize=32)
+def ytdlp_format(resolution) -> str:
+    """yt-dlp format selector for a resolution ('max' or a height such as '720'); built once per value."""
+    if resolution == 'max':
+        return 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
+    res_val = int(resolution)
+    return f'bestvideo[height<={res_val}][ext=mp4]+bestaudio[ext=m4a]/best[height<={res_val}][ext=mp4]/best'
+
+# yt-dlp CLI progress lines, parsed back into the dict shape its progress hooks receive
+YTDLP_PROGRESS_PREFIX = '[progress]'
+_YTDLP_PROGRESS_TEMPLATE = (f"{YTDLP_PROGRESS_PREFIX} %(progress.status)s %(progress.downloaded_bytes)s "
+                            "%(progress.total_bytes)s %(progress.total_bytes_estimate)s")
+
+def _progress_number(value):
+    try:
+        return float(value)
+    except ValueError:
+        return None  # yt-dlp prints NA for unknown sizes
+
+def _run_ytdlp_process(args, status_key):
+    """Run the yt-dlp CLI in a child process, feeding its progress lines to update_progress."""
+    cmd = [sys.executable, '-m', 'yt_dlp', '--newline', '--quiet', '--progress',
+           '--progress-template', _YTDLP_PROGRESS_TEMPLATE, *args]
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, errors='replace')
+    tail = deque(maxlen=20)
+    with proc:
+        for line in proc.stdout:
+            line = line.strip()
+            if line.startswith(YTDLP_PROGRESS_PREFIX):
+                fields = line.split()[1:]
+                if len(fields) == 4:
+                    status, downloaded, total, estimate = fields
+                    update_progress({
+                        'status': status,
+                        'downloaded_bytes': _progress_number(downloaded) or 0,
+                        'total_bytes': _progress_number(total),
+                        'total_bytes_estimate': _progress_number(estimate)
+                    }, status_key)
+            elif line:
+                tail.append(line)
+    if proc.returncode != 0:
+        raise yt_dlp.utils.DownloadError("\n".join(tail) or f"yt-dlp exited with {proc.returncode}")
+
 @retry_on_failure(max_retries=3, delay=2, exceptions=(yt_dlp.utils.DownloadError, Exception))
 def download_video(url, output_path, status_key, resolution='720', cookies_file=None, proxy=None):
     """Download video using yt-dlp with cookie and proxy support"""
@@ -33,15 +92,22 @@ def download_video(url, output_path, status_key, resolution='720', cookies_file=
             base_path = output_path.replace('.%(ext)s', '').replace('%(ext)s', '')
             return download_direct_video(url, base_path, status_key, proxy=proxy)
         
-        # Build format string based on resolution
-        if resolution == 'max':
-            fmt = 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best'
-        else:
-            res_val = int(resolution)
-            fmt = f'bestvideo[height<={res_val}][ext=mp4]+bestaudio[ext=m4a]/best[height<={res_val}][ext=mp4]/best'
-
+        if Config.YTDLP_SUBPROCESS:
+            args = ['-f', ytdlp_format(resolution), '-o', output_path, '--no-playlist',
+                    '--socket-timeout', '30', '--retries', '3', '--fragment-retries', '3',
+                    '--merge-output-format', 'mp4']
+            if cookies_file and os.path.exists(cookies_file):
+                args += ['--cookies', cookies_file]
+                logger.info(f"Using cookies from: {cookies_file}")
+            if proxy:
+                args += ['--proxy', proxy]
+                logger.info(f"Using proxy: {proxy}")
+            _run_ytdlp_process(args + ['--', url], status_key)
+            thread_safe_status_update(status_key, {'status': 'downloaded', 'progress': 50})
+            return True
+        
         ydl_opts = {
-            'format': fmt,
+            'format': ytdlp_format(resolution),
             'outtmpl': output_path,
             'quiet': False,
             'no_warnings': False,
@@ -97,14 +163,19 @@ def download_direct_video(url, output_path, status_key, proxy=None):
         
         file_path = output_path + ext if not output_path.endswith(ext) else output_path
         
+        # Coalesce progress writes: only when the whole percentage moves or 200ms have passed
+        last_reported, last_t = -1, time.monotonic()
         with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192*4):
+            for chunk in response.iter_content(chunk_size=1 << 20):
                 if chunk:
                     f.write(chunk)
                     downloaded += len(chunk)
                     if total_size > 0:
                         progress = min((downloaded / total_size) * 50, 50)
-                        thread_safe_status_update(status_key, {'progress': progress})
+                        now = time.monotonic()
+                        if int(progress) > last_reported or now - last_t > 0.2:
+                            thread_safe_status_update(status_key, {'progress': progress})
+                            last_reported, last_t = int(progress), now
         
         thread_safe_status_update(status_key, {'status': 'downloaded', 'progress': 50})
         return file_path
@@ -119,9 +190,7 @@ def convert_to_tiktok_aspect(input_path, output_path, status_key):
     try:
         thread_safe_status_update(status_key, {'status': 'processing', 'progress': 60})
         
-        probe_cmd = ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_streams', '-select_streams', 'v:0', input_path]
-        result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=30, check=True)
-        video_info = json.loads(result.stdout)
+        video_info = probe_video(input_path)
         video_stream = next((s for s in video_info.get('streams', []) if s.get('codec_type') == 'video'), None)
         
         width = int(video_stream.get('width', 0))
@@ -140,12 +209,17 @@ def convert_to_tiktok_aspect(input_path, output_path, status_key):
             y_offset = (new_height - height) // 2
             filter_complex = f"scale={target_width}:{new_height}:flags=lanczos,pad={target_width}:{target_height}:0:{y_offset}:black"
         
-        ffmpeg_cmd = [
-            'ffmpeg', '-i', input_path, '-vf', filter_complex,
-            '-c:v', 'libx264', '-preset', 'slow', '-crf', '18',
-            '-c:a', 'aac', '-b:a', '192k', '-movflags', '+faststart', '-y', output_path
-        ]
-        subprocess.run(ffmpeg_cmd, check=True, timeout=Config.PROCESS_TIMEOUT)
+        audio_args = aac_audio_args(input_path)
+
+        def build_cmd(encoder):
+            return [
+                'ffmpeg', *h264_device_args(encoder), *hwaccel_args(encoder), '-i', input_path,
+                *h264_video_args(encoder, filter_complex, crf=18, preset='slow'),
+                *audio_args, '-movflags', '+faststart', '-y', output_path
+            ]
+        duration = float(video_info.get('format', {}).get('duration') or 0) or None
+        run_h264_encode(build_cmd, check=True, status_key=status_key, duration=duration,
+                        progress_range=(60, 99), timeout=Config.PROCESS_TIMEOUT)
         thread_safe_status_update(status_key, {'status': 'completed', 'progress': 100})
         return True
     except Exception as e:
@@ -157,7 +231,7 @@ def safe_import_video(input_path, output_path, status_key):
     """
     Import video safely.
     - If MKV: Convert to MP4 (h264/aac) for web compatibility.
-    - Else: Just copy/move the file to preserve original encoding (no normalization).
+    - Else: Move the file into place to preserve original encoding (no normalization).
     Returns: The final absolute path of the imported file.
     """
     try:
@@ -170,18 +244,26 @@ def safe_import_video(input_path, output_path, status_key):
         if ext != '.mp4':
             logger.info(f"Safe import: Non-MP4 ({ext}) detected, normalizing for web: {input_path}")
             final_path = f"{base_output}.mp4"
-            cmd = [
-                'ffmpeg', '-i', input_path,
-                '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
-                '-c:a', 'aac', '-b:a', '128k', '-movflags', '+faststart', '-y', final_path
-            ]
-            subprocess.run(cmd, check=True, timeout=Config.PROCESS_TIMEOUT)
+            audio_args = aac_audio_args(input_path, '128k')
+
+            def build_cmd(encoder):
+                # Straight transcode with no filters, so NVIDIA keeps decoded frames on the GPU
+                return [
+                    'ffmpeg', *h264_device_args(encoder), *hwaccel_args(encoder, keep_on_gpu=True), '-i', input_path,
+                    *h264_video_args(encoder, None, crf=23, preset='fast'),
+                    *audio_args, '-movflags', '+faststart', '-y', final_path
+                ]
+            # Long MKV/WebM normalizations report real progress from ffmpeg's -progress stream
+            run_h264_encode(build_cmd, check=True, timeout=Config.PROCESS_TIMEOUT, status_key=status_key,
+                            duration=probe_duration(input_path), progress_range=(20, 95))
             return final_path
         else:
             logger.info(f"Safe import: Keeping original MP4: {input_path}")
             final_path = f"{base_output}.mp4"
             if input_path != final_path:
-                shutil.copy2(input_path, final_path)
+                # Every caller discards the source afterwards, so a rename (same filesystem) or a
+                # kernel-side sendfile copy (across filesystems) replaces the full userspace copy
+                shutil.move(input_path, final_path)
             return final_path
             
     except Exception as e:
@@ -189,16 +271,83 @@ def safe_import_video(input_path, output_path, status_key):
         thread_safe_status_update(status_key, {'status': 'error', 'error': str(e)})
         raise
 
+def segment_video(input_path, output_pattern, segment_args, status_key, force_key_frames=None,
+                  seek=None, start_number=1):
+    """
+    Cut input into numbered segments in one ffmpeg pass, returning the written filenames.
+    Stream-copies by default; with force_key_frames (a time list, possibly empty) the video is
+    re-encoded once with keyframes at those times, so cuts there are frame-accurate.
+    seek=(start, length) limits the pass to that range of the input (length None runs to the end).
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        segment_list = os.path.join(tmp_dir, 'segments.csv')
+        seek_args = []
+        if seek:
+            seek_args = ['-ss', f"{seek[0]:.3f}"] + (['-t', f"{seek[1]:.3f}"] if seek[1] else [])
+        
+        def build_cmd(encoder=None):
+            if encoder is None:
+                input_args, codec_args = [], list(STREAM_COPY_ARGS)
+            else:
+                input_args = [*h264_device_args(encoder), *hwaccel_args(encoder)]
+                codec_args = [
+                    '-map', '0:v:0', '-map', '0:a?',
+                    *h264_video_args(encoder, None, crf=18, preset='fast'),
+                    *(['-force_key_frames', force_key_frames] if force_key_frames else []),
+                    *aac_audio_args(input_path)
+                ]
+            return [
+                'ffmpeg', *input_args, *seek_args, '-i', input_path,
+                *codec_args,
+                '-f', 'segment', *segment_args, '-reset_timestamps', '1',
+                '-segment_start_number', str(start_number), '-segment_list', segment_list, '-segment_list_type', 'csv',
+                '-avoid_negative_ts', 'make_zero', '-segment_format_options', 'movflags=+faststart',
+                '-y', output_pattern
+            ]
+        
+        duration = seek[1] if seek and seek[1] else probe_duration(input_path)
+        if seek and not seek[1] and duration:
+            duration -= seek[0]
+        if force_key_frames is not None:
+            run_h264_encode(build_cmd, check=True, status_key=status_key, duration=duration, progress_range=(10, 99))
+        else:
+            run_ffmpeg(build_cmd(), status_key, duration, progress_range=(10, 99))
+        with open(segment_list, 'r', encoding='utf-8') as f:
+            return [line.split(',', 1)[0] for line in f if line.strip()]
+
+def segment_scene_ranges(input_path, output_pattern, starts, status_key, parts):
+    """
+    Frame-accurate scene cut with the scenes divided into `parts` contiguous ranges that encode
+    concurrently (e.g. one per NVENC engine). Each range is still a single segment-muxer pass,
+    and clips keep their global numbering. Only the first range reports progress.
+    """
+    per_range = -(-len(starts) // max(1, min(parts, len(starts))))
+    ranges = [(first, min(first + per_range, len(starts))) for first in range(0, len(starts), per_range)]
+    
+    def encode_range(first, last):
+        offset = starts[first]
+        cuts = ",".join(f"{t - offset:.3f}" for t in starts[first + 1:last])
+        segment_args = ['-segment_times', cuts] if cuts else ['-segment_time', '86400']
+        length = starts[last] - offset if last < len(starts) else None
+        return segment_video(input_path, output_pattern, segment_args, status_key if first == 0 else None,
+                             force_key_frames=cuts, seek=(offset, length), start_number=first + 1)
+    
+    with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix='split-encode') as pool:
+        results = list(pool.map(lambda r: encode_range(*r), ranges))
+    return [name for names in results for name in names]
+
 @retry_on_failure(max_retries=2, delay=2)
-def split_scenes(input_path, output_dir, status_key, min_scene_len=2.0, threshold=3.0):
-    """Split video based on scene detection."""
+def split_scenes(input_path, output_dir, status_key, min_scene_len=2.0, threshold=3.0, frame_accurate=False):
+    """Split video based on scene detection; frame_accurate re-encodes once instead of snapping to keyframes."""
     try:
         thread_safe_status_update(status_key, {'status': 'splitting', 'progress': 10})
         video = open_video(input_path)
         scene_manager = SceneManager()
+        scene_manager.auto_downscale = False
+        scene_manager.downscale = Config.SCENE_DETECT_DOWNSCALE
         scene_manager.add_detector(ContentDetector(threshold=threshold, min_scene_len=int(min_scene_len * video.frame_rate)))
         
-        scene_manager.detect_scenes(video)
+        scene_manager.detect_scenes(video, frame_skip=Config.SCENE_DETECT_FRAME_SKIP)
         scene_list = scene_manager.get_scene_list()
         
         if not scene_list:
@@ -206,24 +355,21 @@ def split_scenes(input_path, output_dir, status_key, min_scene_len=2.0, threshol
             return []
 
         base_name = os.path.splitext(os.path.basename(input_path))[0]
-        clips = []
-        for i, (start, end) in enumerate(scene_list):
-            out_name = f"{base_name}_clip_{i+1}.mp4"
-            out_path = os.path.join(output_dir, out_name)
-            
-            start_ts = start.get_seconds()
-            duration = end.get_seconds() - start_ts
-            
-            cmd = [
-                'ffmpeg', '-ss', str(start_ts), '-t', str(duration), '-i', input_path,
-                '-c:v', 'libx264', '-preset', 'slow', '-crf', '18',
-                '-c:a', 'aac', '-b:a', '192k', '-y', out_path
-            ]
-            subprocess.run(cmd, check=True, capture_output=True)
-            clips.append({'title': f"Clip {i+1}", 'filename': out_name})
-            
-            progress = 10 + (i + 1) / len(scene_list) * 90
-            thread_safe_status_update(status_key, {'progress': progress})
+        
+        # Scenes tile the whole video, so one pass through the segment muxer cuts every clip at the
+        # scene boundaries while reading the file once. Stream copy snaps each cut to the next keyframe;
+        # frame-accurate mode re-encodes in the same pass with keyframes forced onto the boundaries
+        output_pattern = os.path.join(output_dir, f"{base_name}_clip_%d.mp4")
+        if frame_accurate and len(scene_list) > 1 and Config.PARALLEL_SPLIT_ENCODES > 1:
+            starts = [start.get_seconds() for start, _ in scene_list]
+            out_names = segment_scene_ranges(input_path, output_pattern, starts, status_key, Config.PARALLEL_SPLIT_ENCODES)
+        else:
+            cut_points = ",".join(f"{start.get_seconds():.3f}" for start, _ in scene_list[1:])
+            # A single scene still goes through the muxer, with a segment length that never triggers
+            segment_args = ['-segment_times', cut_points] if cut_points else ['-segment_time', '86400']
+            out_names = segment_video(input_path, output_pattern, segment_args, status_key,
+                                      force_key_frames=cut_points if frame_accurate and cut_points else None)
+        clips = [{'title': f"Clip {i+1}", 'filename': out_name} for i, out_name in enumerate(out_names)]
             
         thread_safe_status_update(status_key, {'status': 'completed', 'progress': 100})
         return clips
@@ -238,30 +384,15 @@ def split_fixed(input_path, output_dir, status_key, interval=30):
     try:
         thread_safe_status_update(status_key, {'status': 'splitting', 'progress': 10})
         
-        # Get duration
-        probe = subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', input_path], capture_output=True, text=True)
-        total_duration = float(probe.stdout.strip())
-        
         base_name = os.path.splitext(os.path.basename(input_path))[0]
-        clips = []
-        num_clips = int(total_duration // interval) + (1 if total_duration % interval > 0 else 0)
         
-        for i in range(num_clips):
-            start = i * interval
-            out_name = f"{base_name}_part_{i+1}.mp4"
-            out_path = os.path.join(output_dir, out_name)
-            
-            cmd = [
-                'ffmpeg', '-ss', str(start), '-t', str(interval), '-i', input_path,
-                '-c:v', 'libx264', '-preset', 'slow', '-crf', '18',
-                '-c:a', 'aac', '-b:a', '192k', '-y', out_path
-            ]
-            subprocess.run(cmd, check=True, capture_output=True)
-            clips.append({'title': f"Part {i+1}", 'filename': out_name})
-            
-            progress = 10 + (i + 1) / num_clips * 90
-            thread_safe_status_update(status_key, {'progress': progress})
-            
+        # One stream-copy pass through the segment muxer; cuts land on the first keyframe
+        # after each interval boundary, so no clip is re-encoded
+        out_names = segment_video(input_path, os.path.join(output_dir, f"{base_name}_part_%d.mp4"),
+                                  ['-segment_time', str(interval)], status_key)
+        
+        clips = [{'title': f"Part {i+1}", 'filename': out_name} for i, out_name in enumerate(out_names)]
+        
         thread_safe_status_update(status_key, {'status': 'completed', 'progress': 100})
         return clips
     except Exception as e:
@@ -269,19 +400,51 @@ def split_fixed(input_path, output_dir, status_key, interval=30):
         thread_safe_status_update(status_key, {'status': 'error', 'error': str(e)})
         raise
 
-@retry_on_failure(max_retries=2, delay=2)
-def trim_video(input_path, output_path, start_time, end_time, status_key):
-    """Trim a specific segment of the video."""
+def trim_many(input_path, cuts, status_key=None):
+    """
+    Stream-copy several (start_time, end_time, output_path) cuts of one file in a single ffmpeg run.
+    Each cut is its own input-side seek of the same file, so every clip starts on a keyframe
+    exactly as trim_video does, without paying process startup once per clip.
+    """
+    input_args, output_args = [], []
+    for i, (start_time, end_time, output_path) in enumerate(cuts):
+        duration = float(end_time) - float(start_time)
+        input_args += ['-ss', str(start_time), '-t', str(duration), '-i', input_path]
+        output_args += [
+            '-map', f'{i}:v:0', '-map', f'{i}:a?', '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart', '-y', output_path
+        ]
+    # Outputs are written side by side, so out_time tracks the longest cut, not the sum
+    longest = max(float(end) - float(start) for start, end, _ in cuts)
+    logger.info(f"Trimming {len(cuts)} clips from {input_path} in one pass")
+    run_ffmpeg(['ffmpeg', *input_args, *output_args], status_key, longest, progress_range=(30, 99))
+
+@retry_on_failure(max_retries=2, delay=2, retry_kwargs={'fast_retry': True})
+def trim_video(input_path, output_path, start_time, end_time, status_key, fast_retry=False, frame_accurate=False):
+    """Trim a specific segment of the video; frame_accurate re-encodes instead of snapping to keyframes, retries use a faster preset."""
     try:
         thread_safe_status_update(status_key, {'status': 'trimming', 'progress': 30})
         duration = float(end_time) - float(start_time)
         
-        cmd = [
-            'ffmpeg', '-ss', str(start_time), '-t', str(duration), '-i', input_path,
-            '-c:v', 'libx264', '-preset', 'slow', '-crf', '18',
-            '-c:a', 'aac', '-b:a', '192k', '-y', output_path
-        ]
-        subprocess.run(cmd, check=True, capture_output=True)
+        if not frame_accurate:
+            # Input-side seek lands on the keyframe at or before start_time; copying from there
+            # costs only the I/O of the clip
+            run_ffmpeg([
+                'ffmpeg', '-ss', str(start_time), '-t', str(duration), '-i', input_path,
+                *STREAM_COPY_ARGS, '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart', '-y', output_path
+            ], status_key=status_key, duration=duration, progress_range=(30, 99))
+            thread_safe_status_update(status_key, {'status': 'completed', 'progress': 100})
+            return True
+        
+        def build_cmd(encoder):
+            # No filters, so on NVIDIA decoded frames stay in CUDA memory straight into NVENC
+            return [
+                'ffmpeg', *h264_device_args(encoder), *hwaccel_args(encoder, keep_on_gpu=True),
+                '-ss', str(start_time), '-t', str(duration), '-i', input_path,
+                *h264_video_args(encoder, None, crf=18, preset='veryfast' if fast_retry else 'slow'),
+                *AAC_192K_ARGS, '-avoid_negative_ts', 'make_zero', '-movflags', '+faststart', '-y', output_path
+            ]
+        run_h264_encode(build_cmd, check=True, status_key=status_key, duration=duration, progress_range=(30, 99))
         thread_safe_status_update(status_key, {'status': 'completed', 'progress': 100})
         return True
     except Exception as e:
@@ -433,13 +433,13 @@ async function openVideo(video) {
     const player = document.getElementById('videoPlayer');
     const source = document.getElementById('videoSource');
     if (source) {
-        source.src = `/api/stream/${video.project_id}/${encodeURIComponent(video.filename)}`;
+        source.src = `/api/stream/${video.project_id}/${encodeURIComponent(video.filename)}?v=${video.id}`;
         player.load();
     }
 
     const dlLink = document.getElementById('downloadLink');
     if (dlLink) {
-        dlLink.href = `/api/video/${video.project_id}/${encodeURIComponent(video.filename)}`;
+        dlLink.href = `/api/video/${video.project_id}/${encodeURIComponent(video.filename)}?v=${video.id}`;
         dlLink.style.display = 'inline-flex';
     }
 
@@ -569,9 +569,29 @@ function initTimeline() {
     document.addEventListener('keydown', handleKeys);
 }
 
-function setTimelineMarker(type) {
+// Trims stream-copy from the keyframe at or before the start, so start points snap there
+const keyframeCache = {};
+async function snapToKeyframe(time) {
+    const video = window.__currentVideo;
+    if (!video) return time;
+    if (!keyframeCache[video.id]) {
+        keyframeCache[video.id] = fetch(`/api/projects/${video.projectId}/videos/${video.id}/keyframes`)
+            .then(r => r.ok ? r.json() : { keyframes: [] })
+            .then(d => d.keyframes || [])
+            .catch(() => []);
+    }
+    const keyframes = await keyframeCache[video.id];
+    let snapped = keyframes.length ? keyframes[0] : time;
+    for (const k of keyframes) {
+        if (k > time) break;
+        snapped = k;
+    }
+    return snapped;
+}
+
+async function setTimelineMarker(type) {
     const player = document.getElementById('videoPlayer');
-    timelineMarkers[type] = player.currentTime;
+    timelineMarkers[type] = type === 'in' ? await snapToKeyframe(player.currentTime) : player.currentTime;
     updateTimelineDisplay();
 }
 
@@ -626,9 +646,10 @@ function showSplitSettings(type) {
     });
 }
 
-function setTrimTime(target) {
+async function setTrimTime(target) {
     const player = document.getElementById('videoPlayer');
-    document.getElementById(target === 'start' ? 'trimStart' : 'trimEnd').value = player.currentTime.toFixed(1);
+    const time = target === 'start' ? await snapToKeyframe(player.currentTime) : player.currentTime;
+    document.getElementById(target === 'start' ? 'trimStart' : 'trimEnd').value = time.toFixed(3);
 }
 
 async function confirmSplit() {
@@ -1070,6 +1091,7 @@ async function cleanAllServer() {
 // --- Remote Browser Logic ---
 let socket = null;
 let browserInitialized = false;
+let browserFrameUrl = null;
 
 function initSocket() {
     if (socket) return;
@@ -1080,10 +1102,16 @@ function initSocket() {
         if (currentView === 'browser') startRemoteBrowser();
     });
 
-    socket.on('browser_frame', (data) => {
+    socket.on('browser_frame', (data, ack) => {
+        // Ack so the server knows we're keeping up before it sends more frames
+        if (ack) ack();
         const img = document.getElementById('browserScreen');
         if (img) {
-            img.src = 'data:image/jpeg;base64,' + data.image;
+            // Frames arrive as raw WebP/JPEG bytes; release the previous blob URL before swapping
+            const frameUrl = URL.createObjectURL(new Blob([data.image], { type: data.mime }));
+            img.src = frameUrl;
+            if (browserFrameUrl) URL.revokeObjectURL(browserFrameUrl);
+            browserFrameUrl = frameUrl;
             // Hide loading overlay if any
             const overlay = document.getElementById('browserLoadingOverlay');
             if (overlay) overlay.style.display = 'none';
@@ -1393,13 +1421,13 @@ function renderReel(index) {
     const progressEl = document.getElementById('reelProgress');
     const dlBtn = document.getElementById('reelDownloadBtn');
 
-    videoEl.src = `/api/stream/${v.project_id}/${encodeURIComponent(v.filename)}`;
+    videoEl.src = `/api/stream/${v.project_id}/${encodeURIComponent(v.filename)}?v=${v.id}`;
     videoEl.play();
 
     titleEl.textContent = v.title || v.filename;
     subtitleEl.textContent = `${document.getElementById('current-project-title').textContent} • Clip ${index + 1}/${reelVideos.length}`;
 
-    dlBtn.onclick = () => window.open(`/api/video/${v.project_id}/${v.filename}`, '_blank');
+    dlBtn.onclick = () => window.open(`/api/video/${v.project_id}/${v.filename}?v=${v.id}`, '_blank');
 
     videoEl.ontimeupdate = () => {
         const p = (videoEl.currentTime / videoEl.duration) * 100;
@@ -4,9 +4,12 @@ Each handler processes a specific type of job.
 """
 
 import os
+import time
 import logging
+import threading
 import uuid
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, List
 from config import Config
 from database.models import Video, Caption, Project
 from task_queue.job_queue import update_job_progress
@@ -16,20 +19,65 @@ from services.video_service import (
     safe_import_video,
     split_scenes,
     split_fixed,
+    trim_many,
     trim_video
 )
 from services.caption_service import (
-    get_whisper_model,
+    get_whisper_worker,
+    transcribe_audio,
+    transcribe_batch,
     write_srt,
     burn_captions
 )
 
-from utils.helpers import extract_title
+from utils.helpers import (
+    extract_title,
+    get_h264_encoder,
+    h264_device_args,
+    h264_encoder_args,
+    h264_video_args,
+    hwaccel_args,
+    aac_audio_args,
+    cuvid_cover_args,
+    run_h264_encode,
+    probe_duration,
+    file_size,
+    media_info,
+    remove_file
+)
 
 logger = logging.getLogger(__name__)
 
+# Resolved paths per (video id, filename), so back-to-back jobs on a video skip the stats
+VIDEO_PATH_TTL = 30  # seconds
+VIDEO_PATH_CACHE_SIZE = 1024
+_video_path_cache = OrderedDict()  # (video_id, filename) -> (path, expires_at), least recent first
+_video_path_lock = threading.Lock()
+
 def get_video_path(video: Dict[str, Any]) -> str:
     """Resolve the absolute path for a video, checking both upload and processed folders."""
+    key = (video['id'], video['filename'])
+    with _video_path_lock:
+        cached = _video_path_cache.get(key)
+        if cached and cached[1] > time.monotonic():
+            _video_path_cache.move_to_end(key)
+            return cached[0]
+    
+    path, found = _resolve_video_path(video)
+    # Upload-folder results are cached too once they exist: imported sources live there, and
+    # otherwise each lookup would repeat the failed processed/clip stats before falling back.
+    # Misses aren't cached, so a file written after the first lookup is picked up.
+    if not found:
+        return path
+    with _video_path_lock:
+        _video_path_cache[key] = (path, time.monotonic() + VIDEO_PATH_TTL)
+        _video_path_cache.move_to_end(key)
+        if len(_video_path_cache) > VIDEO_PATH_CACHE_SIZE:
+            _video_path_cache.popitem(last=False)
+    return path
+
+def _resolve_video_path(video: Dict[str, Any]) -> tuple:
+    """Return (path, found): the first existing location, else the upload path unconfirmed."""
     filename = video['filename']
     upload_path = os.path.join(Config.UPLOAD_FOLDER, filename)
     processed_path = os.path.join(Config.PROCESSED_FOLDER, filename)
@@ -38,10 +86,10 @@ def get_video_path(video: Dict[str, Any]) -> str:
     clip_subfolder_path = os.path.join(Config.PROCESSED_FOLDER, f"clips_{video['parent_video_id']}", filename) if video.get('parent_video_id') else None
     
     if os.path.exists(processed_path):
-        return processed_path
+        return processed_path, True
     if clip_subfolder_path and os.path.exists(clip_subfolder_path):
-        return clip_subfolder_path
-    return upload_path
+        return clip_subfolder_path, True
+    return upload_path, os.path.exists(upload_path)
 
 def handle_download_job(job: Dict[str, Any]) -> Dict[str, Any]:
     """Handle video download and import without auto-cropping."""
@@ -82,18 +130,19 @@ def handle_download_job(job: Dict[str, Any]) -> Dict[str, Any]:
     safe_import_video(raw_path, processed_path, job['id'])
     
     # Clean up raw file 
-    if os.path.exists(raw_path):
-        os.remove(raw_path)
+    remove_file(raw_path)
 
     update_job_progress(job['id'], 95, "Finalizing...")
-    size_bytes = os.path.getsize(processed_path) if os.path.exists(processed_path) else None
+    size_bytes = file_size(processed_path)
     
     video = Video.create(
         project_id=project_id,
         title=title,
         filename=processed_filename,
         source_url=url,
-        size_bytes=size_bytes
+        size_bytes=size_bytes,
+        # One ffprobe of the finished file (cached for later jobs on it) fills in the metadata
+        **media_info(processed_path)
     )
     
     return {'video_id': video['id'], 'filename': processed_filename}
@@ -127,38 +176,26 @@ def handle_upload_job(job: Dict[str, Any]) -> Dict[str, Any]:
     # We will handle sidecar logic in 'browser_import' more reliably.
     
     # Remove original temp file
-    if os.path.exists(temp_path) and os.path.abspath(temp_path) != os.path.abspath(final_path):
-        os.remove(temp_path)
+    # Both paths are built from UPLOAD_FOLDER, so plain string comparison is enough
+    if temp_path != final_path:
+        remove_file(temp_path)
         
-    size_bytes = os.path.getsize(final_path) if os.path.exists(final_path) else None
+    size_bytes = file_size(final_path)
     video = Video.create(
         project_id=project_id,
         title=title,
         filename=final_filename,
-        size_bytes=size_bytes
+        size_bytes=size_bytes,
+        **media_info(final_path)
     )
     
     return {'video_id': video['id'], 'filename': final_filename}
 
 
-def handle_caption_job(job: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Handle caption generation job.
-    
-    Input data:
-        - model_size: Whisper model size (tiny, base, small, medium, large)
-        - word_level: Boolean for word-level timestamps
-    
-    Output data:
-        - caption_id: Created caption ID
-        - filename: Caption filename
-    """
-    logger.info(f"Processing caption job: {job['id']}")
-    
+def _prepare_caption_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a caption job and resolve its video file."""
     input_data = job.get('input_data', {})
     video_id = job.get('video_id')
-    model_size = input_data.get('model_size', 'tiny')
-    word_level = input_data.get('word_level', False)
     
     if not video_id:
         raise ValueError("video_id is required for caption job")
@@ -171,16 +208,18 @@ def handle_caption_job(job: Dict[str, Any]) -> Dict[str, Any]:
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video file not found: {video_path}")
     
-    update_job_progress(job['id'], 10, "Loading Whisper model...")
-    
-    # Get Whisper model
-    model = get_whisper_model(model_size)
-    
-    update_job_progress(job['id'], 20, "Transcribing audio...")
-    
-    # Transcribe
-    segments, _ = model.transcribe(video_path, word_timestamps=word_level)
-    segments_list = list(segments)
+    return {
+        'job': job,
+        'video': video,
+        'video_path': video_path,
+        'model_size': input_data.get('model_size', 'tiny'),
+        'word_level': input_data.get('word_level', False)
+    }
+
+
+def _finish_caption_job(prepared: Dict[str, Any], segments_list) -> Dict[str, Any]:
+    """Write the SRT for a transcribed caption job and record it."""
+    job, video = prepared['job'], prepared['video']
     
     update_job_progress(job['id'], 80, "Writing caption file...")
     
@@ -188,11 +227,11 @@ def handle_caption_job(job: Dict[str, Any]) -> Dict[str, Any]:
     caption_filename = f"{os.path.splitext(video['filename'])[0]}.srt"
     caption_path = os.path.join(Config.CAPTIONS_FOLDER, caption_filename)
     
-    write_srt(segments_list, caption_path, word_level)
+    write_srt(segments_list, caption_path, prepared['word_level'])
     
     # Create caption record
     caption = Caption.create(
-        video_id=video_id,
+        video_id=video['id'],
         filename=caption_filename,
         language='en',
         format='srt'
@@ -206,6 +245,89 @@ def handle_caption_job(job: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def handle_caption_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handle caption generation job.
+    
+    Input data:
+        - model_size: Whisper model size (tiny, base, small, medium, large)
+        - word_level: Boolean for word-level timestamps
+    
+    Output data:
+        - caption_id: Created caption ID
+        - filename: Caption filename
+    """
+    logger.info(f"Processing caption job: {job['id']}")
+    
+    prepared = _prepare_caption_job(job)
+    
+    update_job_progress(job['id'], 10, "Loading Whisper model...")
+    
+    # Get Whisper worker (model is loaded once per size and shared across jobs)
+    get_whisper_worker(prepared['model_size'])
+    
+    update_job_progress(job['id'], 20, "Transcribing audio...")
+    
+    # Transcribe (voice activity detection skips silent stretches)
+    segments_list, _ = transcribe_audio(prepared['video_path'], prepared['word_level'], prepared['model_size'])
+    
+    return _finish_caption_job(prepared, segments_list)
+
+
+def handle_caption_batch(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Handle several queued caption jobs at once.
+    
+    Jobs sharing a model size and word_level setting are transcribed together so their
+    audio fills the same Whisper batches. Returns {job_id: result dict or Exception}.
+    """
+    logger.info(f"Processing caption batch of {len(jobs)} jobs")
+    
+    results = {}
+    groups = {}
+    for job in jobs:
+        try:
+            prepared = _prepare_caption_job(job)
+        except Exception as e:
+            results[job['id']] = e
+            continue
+        prepared['duration'] = probe_duration(prepared['video_path']) or 0
+        groups.setdefault((prepared['model_size'], prepared['word_level']), []).append(prepared)
+    
+    for (model_size, word_level), group in groups.items():
+        # Split each group so one pass never holds more than CAPTION_BATCH_MAX_SECONDS of audio
+        batches, current, seconds = [], [], 0
+        for prepared in group:
+            if current and seconds + prepared['duration'] > Config.CAPTION_BATCH_MAX_SECONDS:
+                batches.append(current)
+                current, seconds = [], 0
+            current.append(prepared)
+            seconds += prepared['duration']
+        batches.append(current)
+        
+        for batch in batches:
+            for prepared in batch:
+                update_job_progress(prepared['job']['id'], 20, f"Transcribing audio (batch of {len(batch)})...")
+            try:
+                transcripts = transcribe_batch([p['video_path'] for p in batch], word_level, model_size)
+            except Exception as e:
+                # Fall back to one file at a time so a single bad input only fails its own job
+                logger.warning(f"Batched transcription failed, transcribing individually: {str(e)}")
+                transcripts = None
+            
+            for i, prepared in enumerate(batch):
+                try:
+                    if transcripts is None:
+                        segments_list, _ = transcribe_audio(prepared['video_path'], word_level, model_size)
+                    else:
+                        segments_list = transcripts[i]
+                    results[prepared['job']['id']] = _finish_caption_job(prepared, segments_list)
+                except Exception as e:
+                    results[prepared['job']['id']] = e
+    
+    return results
+
+
 def handle_burn_job(job: Dict[str, Any]) -> Dict[str, Any]:
     """
     Handle caption burning job.
@@ -213,6 +335,7 @@ def handle_burn_job(job: Dict[str, Any]) -> Dict[str, Any]:
     Input data:
         - caption_id: Caption to burn (optional, will use latest if not specified)
         - style: Caption style dict (optional)
+        - aspect: Aspect preset to convert to in the same pass (optional)
     
     Output data:
         - video_id: Created burned video ID
@@ -224,6 +347,7 @@ def handle_burn_job(job: Dict[str, Any]) -> Dict[str, Any]:
     video_id = job.get('video_id')
     caption_id = input_data.get('caption_id')
     style = input_data.get('style')
+    aspect = input_data.get('aspect')
     
     if not video_id:
         raise ValueError("video_id is required for burn job")
@@ -259,18 +383,20 @@ def handle_burn_job(job: Dict[str, Any]) -> Dict[str, Any]:
     
     update_job_progress(job['id'], 10, "Burning captions...")
     
-    # Burn captions
-    burn_captions(video_path, caption_path, output_path, job['id'], style)
+    # Burn captions; an aspect conversion rides along in the same decode/encode pass
+    aspect_config = ASPECT_CONFIGS.get(aspect)
+    pre_filter = aspect_filter(aspect_config) if aspect_config else None
+    burn_captions(video_path, caption_path, output_path, job['id'], style, pre_filter=pre_filter)
     
     update_job_progress(job['id'], 90, "Creating database entry...")
     
     # Get file size
-    size_bytes = os.path.getsize(output_path) if os.path.exists(output_path) else None
+    size_bytes = file_size(output_path)
     
     # Create new video record for burned version
     burned_video = Video.create(
         project_id=video['project_id'],
-        title=f"{video['title']} (Captioned)",
+        title=f"{aspect_config['label']} - {video['title']} (Captioned)" if aspect_config else f"{video['title']} (Captioned)",
         filename=burned_filename,
         parent_video_id=video_id,
         size_bytes=size_bytes,
@@ -285,6 +411,20 @@ def handle_burn_job(job: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def create_clip_videos(video: Dict[str, Any], clips_data: List[Dict[str, Any]], output_dir: str) -> List[str]:
+    """Insert video records for split clips in a single transaction."""
+    return Video.create_many([
+        {
+            'project_id': video['project_id'],
+            'title': data['title'],
+            'filename': data['filename'],
+            'parent_video_id': video['id'],
+            'is_clip': 1,
+            'size_bytes': file_size(os.path.join(output_dir, data['filename']))
+        }
+        for data in clips_data
+    ])
+
 def handle_split_scenes_job(job: Dict[str, Any]) -> Dict[str, Any]:
     """
     Handle scene-based video splitting job.
@@ -292,6 +432,7 @@ def handle_split_scenes_job(job: Dict[str, Any]) -> Dict[str, Any]:
     Input data:
         - min_scene_len: Minimum scene length in seconds
         - threshold: Scene detection threshold
+        - frame_accurate: Re-encode once so cuts land exactly on scene boundaries
     
     Output data:
         - video_ids: List of created clip video IDs
@@ -303,6 +444,7 @@ def handle_split_scenes_job(job: Dict[str, Any]) -> Dict[str, Any]:
     video_id = job.get('video_id')
     min_scene_len = input_data.get('min_scene_len', 2.0)
     threshold = input_data.get('threshold', 3.0)
+    frame_accurate = bool(input_data.get('frame_accurate', False))
     
     if not video_id:
         raise ValueError("video_id is required for split job")
@@ -323,26 +465,12 @@ def handle_split_scenes_job(job: Dict[str, Any]) -> Dict[str, Any]:
     
     # Split video
     status_key = f"split_{job['id']}"
-    clips_data = split_scenes(video_path, output_dir, job['id'], min_scene_len, threshold)
+    clips_data = split_scenes(video_path, output_dir, job['id'], min_scene_len, threshold, frame_accurate)
     
     update_job_progress(job['id'], 80, "Creating database entries...")
     
     # Create video records for clips
-    video_ids = []
-    for data in clips_data:
-        clip_filename = data['filename']
-        clip_path = os.path.join(output_dir, clip_filename)
-        size_bytes = os.path.getsize(clip_path) if os.path.exists(clip_path) else None
-        
-        clip_video = Video.create(
-            project_id=video['project_id'],
-            title=data['title'],
-            filename=clip_filename,
-            parent_video_id=video_id,
-            is_clip=1,
-            size_bytes=size_bytes
-        )
-        video_ids.append(clip_video['id'])
+    video_ids = create_clip_videos(video, clips_data, output_dir)
     
     logger.info(f"Split completed: {len(video_ids)} clips")
     return {'video_ids': video_ids, 'count': len(video_ids)}
@@ -366,45 +494,17 @@ def handle_split_fixed_job(job: Dict[str, Any]) -> Dict[str, Any]:
     clips_data = split_fixed(video_path, output_dir, job['id'], interval)
     
     update_job_progress(job['id'], 80, "Creating database entries...")
-    video_ids = []
-    for data in clips_data:
-        clip_filename = data['filename']
-        clip_path = os.path.join(output_dir, clip_filename)
-        size_bytes = os.path.getsize(clip_path) if os.path.exists(clip_path) else None
-        
-        clip_video = Video.create(
-            project_id=video['project_id'],
-            title=data['title'],
-            filename=clip_filename,
-            parent_video_id=video_id,
-            is_clip=1,
-            size_bytes=size_bytes
-        )
-        video_ids.append(clip_video['id'])
+    video_ids = create_clip_videos(video, clips_data, output_dir)
     
     return {'video_ids': video_ids, 'count': len(video_ids)}
 
 
-def handle_trim_job(job: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Handle video trimming job.
-    
-    Input data:
-        - start_time: Start time in seconds
-        - end_time: End time in seconds
-        - title: Title for trimmed video (optional)
-    
-    Output data:
-        - video_id: Created trimmed video ID
-        - filename: Output filename
-    """
-    logger.info(f"Processing trim job: {job['id']}")
-    
+def _prepare_trim_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a trim job and resolve its source and output paths."""
     input_data = job.get('input_data', {})
     video_id = job.get('video_id')
     start_time = input_data.get('start_time')
     end_time = input_data.get('end_time')
-    title = input_data.get('title', 'Trimmed Video')
     
     if not video_id or start_time is None or end_time is None:
         raise ValueError("video_id, start_time, and end_time are required for trim job")
@@ -420,36 +520,136 @@ def handle_trim_job(job: Dict[str, Any]) -> Dict[str, Any]:
     # Generate output filename
     trim_id = str(uuid.uuid4())
     trimmed_filename = f"trim_{trim_id}.mp4"
-    output_path = os.path.join(Config.PROCESSED_FOLDER, trimmed_filename)
-    
-    update_job_progress(job['id'], 10, "Trimming video...")
-    
-    # Trim video
-    trim_video(video_path, output_path, start_time, end_time, job['id'])
     
+    return {
+        'job': job,
+        'video': video,
+        'video_path': video_path,
+        'start_time': start_time,
+        'end_time': end_time,
+        'title': input_data.get('title', 'Trimmed Video'),
+        'frame_accurate': bool(input_data.get('frame_accurate', False)),
+        'filename': trimmed_filename,
+        'output_path': os.path.join(Config.PROCESSED_FOLDER, trimmed_filename)
+    }
+
+
+def _finish_trim_job(prepared: Dict[str, Any]) -> Dict[str, Any]:
+    """Create the video record for a finished trim."""
+    job, video = prepared['job'], prepared['video']
     update_job_progress(job['id'], 90, "Creating database entry...")
     
-    # Get file size
-    size_bytes = os.path.getsize(output_path) if os.path.exists(output_path) else None
-    
     # Create video record for trimmed version
     trimmed_video = Video.create(
         project_id=video['project_id'],
-        title=title,
-        filename=trimmed_filename,
-        parent_video_id=video_id,
+        title=prepared['title'],
+        filename=prepared['filename'],
+        parent_video_id=video['id'],
         is_clip=1,
-        size_bytes=size_bytes
+        size_bytes=file_size(prepared['output_path'])
     )
     
     logger.info(f"Trim job completed: {trimmed_video['id']}")
     
     return {
         'video_id': trimmed_video['id'],
-        'filename': trimmed_filename
+        'filename': prepared['filename']
     }
 
 
+def handle_trim_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handle video trimming job.
+    
+    Input data:
+        - start_time: Start time in seconds
+        - end_time: End time in seconds
+        - title: Title for trimmed video (optional)
+        - frame_accurate: Re-encode so the cut starts exactly at start_time (optional)
+    
+    Output data:
+        - video_id: Created trimmed video ID
+        - filename: Output filename
+    """
+    logger.info(f"Processing trim job: {job['id']}")
+    prepared = _prepare_trim_job(job)
+    
+    update_job_progress(job['id'], 10, "Trimming video...")
+    
+    # Trim video
+    trim_video(prepared['video_path'], prepared['output_path'], prepared['start_time'],
+               prepared['end_time'], job['id'], frame_accurate=prepared['frame_accurate'])
+    
+    return _finish_trim_job(prepared)
+
+
+def handle_trim_batch(jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Handle several queued trim jobs at once.
+    
+    Stream-copy trims of the same source are cut in one ffmpeg run; frame-accurate trims and
+    lone cuts go through handle_trim_job. Returns {job_id: result dict or Exception}.
+    """
+    logger.info(f"Processing trim batch of {len(jobs)} jobs")
+    
+    results = {}
+    singles = []
+    groups = {}
+    for job in jobs:
+        try:
+            prepared = _prepare_trim_job(job)
+        except Exception as e:
+            results[job['id']] = e
+            continue
+        if prepared['frame_accurate']:
+            singles.append(job)
+        else:
+            groups.setdefault(prepared['video_path'], []).append(prepared)
+    
+    for video_path, group in groups.items():
+        if len(group) == 1:
+            singles.append(group[0]['job'])
+            continue
+        for prepared in group:
+            update_job_progress(prepared['job']['id'], 10, f"Trimming video (batch of {len(group)})...")
+        try:
+            trim_many(video_path, [(p['start_time'], p['end_time'], p['output_path']) for p in group],
+                      group[0]['job']['id'])
+        except Exception as e:
+            # Fall back to one cut at a time so a single bad range only fails its own job
+            logger.warning(f"Batched trim failed, trimming individually: {str(e)}")
+            singles.extend(p['job'] for p in group)
+            continue
+        for prepared in group:
+            try:
+                results[prepared['job']['id']] = _finish_trim_job(prepared)
+            except Exception as e:
+                results[prepared['job']['id']] = e
+    
+    for job in singles:
+        try:
+            results[job['id']] = handle_trim_job(job)
+        except Exception as e:
+            results[job['id']] = e
+    
+    return results
+
+
+# Aspect ratio presets
+ASPECT_CONFIGS = {
+    '9:16': {'width': 1080, 'height': 1920, 'label': 'Vertical'},  # TikTok, Reels
+    '16:9': {'width': 1920, 'height': 1080, 'label': 'Landscape'},  # YouTube
+    '1:1': {'width': 1080, 'height': 1080, 'label': 'Square'},  # Instagram
+    '4:5': {'width': 1080, 'height': 1350, 'label': 'Portrait'},  # Instagram Feed
+    '21:9': {'width': 2560, 'height': 1080, 'label': 'Ultrawide'},  # Cinematic
+}
+
+
+def aspect_filter(config: Dict[str, Any]) -> str:
+    """Smart scaling: scale to cover the target frame, then crop the overflow."""
+    return f"scale=w={config['width']}:h={config['height']}:force_original_aspect_ratio=increase,crop={config['width']}:{config['height']}"
+
+
 def handle_convert_aspect_job(job: Dict[str, Any]) -> Dict[str, Any]:
     """Handle aspect ratio conversion with multiple options."""
     video_id = job.get('video_id')
@@ -461,36 +661,34 @@ def handle_convert_aspect_job(job: Dict[str, Any]) -> Dict[str, Any]:
     video = Video.get_by_id(video_id)
     video_path = get_video_path(video)
     
-    # Aspect ratio presets
-    aspect_configs = {
-        '9:16': {'width': 1080, 'height': 1920, 'label': 'Vertical'},  # TikTok, Reels
-        '16:9': {'width': 1920, 'height': 1080, 'label': 'Landscape'},  # YouTube
-        '1:1': {'width': 1080, 'height': 1080, 'label': 'Square'},  # Instagram
-        '4:5': {'width': 1080, 'height': 1350, 'label': 'Portrait'},  # Instagram Feed
-        '21:9': {'width': 2560, 'height': 1080, 'label': 'Ultrawide'},  # Cinematic
-    }
-    
-    if aspect not in aspect_configs:
+    if aspect not in ASPECT_CONFIGS:
         aspect = '9:16'
     
-    config = aspect_configs[aspect]
+    config = ASPECT_CONFIGS[aspect]
     output_filename = f"{config['label'].lower()}_{video['filename']}"
     output_path = os.path.join(Config.PROCESSED_FOLDER, output_filename)
     
     update_job_progress(job['id'], 20, f"Converting to {config['label']} ({aspect})...")
     
-    # Smart scaling: crop if larger, pad if smaller
-    vf = f"scale=w={config['width']}:h={config['height']}:force_original_aspect_ratio=increase,crop={config['width']}:{config['height']}"
-    
-    cmd = [
-        'ffmpeg', '-i', video_path,
-        '-vf', vf, '-c:v', 'libx264', '-preset', 'medium',
-        '-crf', '20', '-c:a', 'aac', '-b:a', '192k', '-y', output_path
-    ]
-    
-    update_job_progress(job['id'], 40, "Processing...")
-    import subprocess
-    subprocess.run(cmd, check=True)
+    vf = aspect_filter(config)
+    audio_args = aac_audio_args(video_path)
+    # On NVIDIA, NVDEC crops/resizes while decoding and NVENC encodes, so frames never leave the GPU
+    nvdec_args = cuvid_cover_args(video_path, config['width'], config['height']) if get_h264_encoder() == 'h264_nvenc' else None
+    
+    def build_cmd(encoder):
+        if encoder == 'h264_nvenc' and nvdec_args:
+            return [
+                'ffmpeg', *nvdec_args, '-i', video_path,
+                *h264_encoder_args(encoder, crf=20), *audio_args,
+                '-movflags', '+faststart', '-y', output_path
+            ]
+        return [
+            'ffmpeg', *h264_device_args(encoder), *hwaccel_args(encoder), '-i', video_path,
+            *h264_video_args(encoder, vf, crf=20, preset='medium'), *audio_args,
+            '-movflags', '+faststart', '-y', output_path
+        ]
+    
+    run_h264_encode(build_cmd, check=True, status_key=job['id'], duration=probe_duration(video_path), progress_range=(20, 95))
     
     converted_video = Video.create(
         project_id=video['project_id'],
@@ -543,12 +741,13 @@ def handle_browser_import_job(job: Dict[str, Any]) -> Dict[str, Any]:
         try: os.remove(temp_path)
         except: pass
         
-    size_bytes = os.path.getsize(final_path) if os.path.exists(final_path) else None
+    size_bytes = file_size(final_path)
     video = Video.create(
         project_id=project_id,
         title=original_name,
         filename=final_filename,
-        size_bytes=size_bytes
+        size_bytes=size_bytes,
+        **media_info(final_path)
     )
 
     # Check for sidecar captions
@@ -583,3 +782,15 @@ JOB_HANDLERS = {
     'convert_aspect': handle_convert_aspect_job,
     'browser_import': handle_browser_import_job
 }
+
+# Worker pool per job type (see JobQueue); unlisted types run on the default transcode pool
+JOB_POOLS = {
+    'download': 'download',
+    'caption': 'transcribe',
+}
+
+# Job types a worker may drain from the queue and hand over together: type -> (handler, max batch)
+BATCH_JOB_HANDLERS = {
+    'caption': (handle_caption_batch, Config.CAPTION_BATCH_SIZE),
+    'trim': (handle_trim_batch, Config.TRIM_BATCH_SIZE),
+}
@@ -3,6 +3,7 @@ Professional job queue system with worker pool for concurrent processing.
 Handles multiple jobs simultaneously with priority support and real-time updates.
 """
 
+import heapq
 import logging
 import queue
 import threading
@@ -11,19 +12,63 @@ import traceback
 from typing import Callable, Dict, Any, Optional, List
 from datetime import datetime
 from database.models import Job
+from utils.helpers import cancel_retries, forget_progress_rate_limit
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_POOL = 'default'
+
+# Handler progress is kept in memory and written to the DB at most once per interval per job
+PROGRESS_FLUSH_INTERVAL = 0.5  # seconds
+_progress_cache: Dict[str, tuple] = {}  # job_id -> (progress, message, last_flush, dirty)
+_progress_lock = threading.Lock()
+_flush_timer: Optional[threading.Timer] = None
+
+
+class FastPriorityQueue:
+    """
+    Minimal heap-backed priority queue for the worker pool.
+    Each put wakes a single waiting worker; get/get_nowait raise queue.Empty like PriorityQueue.
+    """
+    
+    def __init__(self):
+        self._heap = []
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+    
+    def put(self, item):
+        with self._lock:
+            heapq.heappush(self._heap, item)
+            self._not_empty.notify()
+    
+    def get(self, timeout: float = None):
+        with self._lock:
+            if not self._not_empty.wait_for(lambda: self._heap, timeout):
+                raise queue.Empty
+            return heapq.heappop(self._heap)
+    
+    def get_nowait(self):
+        with self._lock:
+            if not self._heap:
+                raise queue.Empty
+            return heapq.heappop(self._heap)
+    
+    def qsize(self) -> int:
+        return len(self._heap)
+
 
 class JobWorker(threading.Thread):
     """Worker thread that processes jobs from the queue."""
     
-    def __init__(self, worker_id: int, job_queue: queue.PriorityQueue,
-                 job_handlers: Dict[str, Callable], stop_event: threading.Event):
+    def __init__(self, worker_id: int, job_queue: FastPriorityQueue,
+                 job_handlers: Dict[str, Callable], stop_event: threading.Event,
+                 batch_handlers: Dict[str, tuple] = None, pool: str = DEFAULT_POOL):
         super().__init__(daemon=True)
         self.worker_id = worker_id
+        self.pool = pool
         self.job_queue = job_queue
         self.job_handlers = job_handlers
+        self.batch_handlers = batch_handlers if batch_handlers is not None else {}
         self.stop_event = stop_event
         self.current_job_id = None
         self.name = f"JobWorker-{worker_id}"
@@ -37,13 +82,16 @@ class JobWorker(threading.Thread):
             try:
                 # Get job from queue with timeout to check stop_event periodically
                 try:
-                    priority, job_id = self.job_queue.get(timeout=1.0)
+                    priority, job_id, job_type = self.job_queue.get(timeout=1.0)
                 except queue.Empty:
                     continue
                 
-                # Process the job
-                self.process_job(job_id)
-                self.job_queue.task_done()
+                # Process the job, together with queued jobs of the same type if it batches
+                batch = self._collect_batch(job_id, job_type)
+                if len(batch) > 1:
+                    self.process_batch(batch)
+                else:
+                    self.process_job(job_id)
                 
             except Exception as e:
                 logger.error(f"{self.name} encountered error: {str(e)}")
@@ -51,9 +99,95 @@ class JobWorker(threading.Thread):
         
         logger.info(f"{self.name} stopped")
     
+    def _collect_batch(self, job_id: str, job_type: str) -> List[str]:
+        """Drain queued jobs of the same batchable type as job_id, putting others back."""
+        # Queue items carry their type, so jobs that can't batch never touch the DB here
+        if job_type not in self.batch_handlers:
+            return [job_id]
+        
+        max_batch = self.batch_handlers[job_type][1]
+        batch, skipped = [job_id], []
+        # Look a bounded distance into the queue so draining stays cheap when it's long
+        while len(batch) < max_batch and len(skipped) < max_batch * 2:
+            try:
+                item = self.job_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[2] != job_type:
+                skipped.append(item)
+                continue
+            other = Job.get_by_id(item[1])
+            if other and other['status'] == Job.STATUS_PENDING:
+                batch.append(item[1])
+            else:
+                skipped.append(item)
+        
+        for item in skipped:
+            self.job_queue.put(item)
+        return batch
+    
+    def process_batch(self, job_ids: List[str]):
+        """Process several jobs of one type through its batch handler."""
+        jobs = []
+        for job_id in job_ids:
+            job = Job.get_by_id(job_id)
+            if not job or job['status'] == Job.STATUS_CANCELLED:
+                continue
+            Job.update_status(job_id, Job.STATUS_RUNNING, progress=0)
+            jobs.append(job)
+        if not jobs:
+            return
+        
+        job_type = jobs[0]['type']
+        logger.info(f"{self.name} - Processing batch of {len(jobs)} {job_type} jobs")
+        self.current_job_id = jobs[0]['id']
+        
+        try:
+            start_time = time.time()
+            try:
+                results = self.batch_handlers[job_type][0](jobs)
+            except Exception as e:
+                results = {job['id']: e for job in jobs}
+            execution_time = time.time() - start_time
+            
+            for job in jobs:
+                if job['id'] not in results:
+                    # A handler that drops a job must not have it reported as a success
+                    logger.error(f"{self.name} - Job {job['id']} got no result from the {job_type} batch handler")
+                    self._mark_failed(job, "no result from batch handler")
+                    continue
+                result = results[job['id']]
+                if isinstance(result, Exception):
+                    logger.error(f"{self.name} - Job {job['id']} failed: {str(result)}")
+                    self._mark_failed(job, str(result))
+                else:
+                    discard_job_progress(job['id'])
+                    Job.update_status(job['id'], Job.STATUS_COMPLETED, progress=100, output_data=result or {})
+            
+            logger.info(f"{self.name} - Batch of {len(jobs)} {job_type} jobs finished in {execution_time:.2f}s")
+        finally:
+            self.current_job_id = None
+    
+    def _mark_failed(self, job: Dict[str, Any], error_msg: str):
+        """Record a job failure and queue a retry if it has attempts left."""
+        job_id = job['id']
+        discard_job_progress(job_id)
+        Job.update_status(
+            job_id,
+            Job.STATUS_FAILED,
+            error_message=error_msg
+        )
+        
+        # Check if job should be retried; failing doesn't touch the retry counters,
+        # so the row loaded when the job started is still current
+        if job['retry_count'] < job['max_retries']:
+            logger.info(f"Job {job_id} will be retried")
+            Job.retry(job_id)
+    
     def process_job(self, job_id: str):
         """Process a single job."""
         self.current_job_id = job_id
+        job = None
         
         try:
             # Get job from database
@@ -82,6 +216,7 @@ class JobWorker(threading.Thread):
             execution_time = time.time() - start_time
             
             # Update job as completed
+            discard_job_progress(job_id)
             Job.update_status(
                 job_id,
                 Job.STATUS_COMPLETED,
@@ -95,22 +230,19 @@ class JobWorker(threading.Thread):
             )
             
         except Exception as e:
-            error_msg = f"{str(e)}\n{traceback.format_exc()}"
-            logger.error(f"{self.name} - Job {job_id} failed: {str(e)}")
-            logger.error(traceback.format_exc())
+            tb = traceback.format_exc()
+            logger.error(f"{self.name} - Job {job_id} failed: {str(e)}\n{tb}")
             
             # Update job as failed
-            Job.update_status(
-                job_id,
-                Job.STATUS_FAILED,
-                error_message=error_msg
-            )
-            
-            # Check if job should be retried
-            job = Job.get_by_id(job_id)
-            if job and job['retry_count'] < job['max_retries']:
-                logger.info(f"Job {job_id} will be retried")
-                Job.retry(job_id)
+            if job:
+                self._mark_failed(job, f"{str(e)}\n{tb}")
+            else:
+                # The lookup itself failed; still fail the row so it doesn't sit pending forever
+                discard_job_progress(job_id)
+                try:
+                    Job.update_status(job_id, Job.STATUS_FAILED, error_message=f"{str(e)}\n{tb}")
+                except Exception as db_error:
+                    logger.error(f"{self.name} - Could not mark job {job_id} as failed: {db_error}")
         
         finally:
             self.current_job_id = None
@@ -118,20 +250,28 @@ class JobWorker(threading.Thread):
 
 class JobQueue:
     """
-    Professional job queue manager with worker pool.
+    Professional job queue manager with worker pools.
     Handles job submission, prioritization, and concurrent execution.
+    
+    Each pool has its own queue and workers, so job types bound by different
+    resources (network, transcription, transcoding) never wait behind each other.
+    Job types not listed in job_pools run on the default pool of num_workers.
     """
     
-    def __init__(self, num_workers: int = 4):
+    def __init__(self, num_workers: int = 4, pool_config: Dict[str, int] = None,
+                 job_pools: Dict[str, str] = None):
         self.num_workers = num_workers
-        self.queue = queue.PriorityQueue()
+        self.pool_config = {DEFAULT_POOL: num_workers, **(pool_config or {})}
+        self.job_pools = {job_type: pool for job_type, pool in (job_pools or {}).items() if pool in self.pool_config}
+        self.queues = {pool: FastPriorityQueue() for pool in self.pool_config}
         self.workers = []
         self.job_handlers = {}
+        self.batch_handlers = {}
         self.stop_event = threading.Event()
         self._lock = threading.Lock()
         self._started = False
         
-        logger.info(f"JobQueue initialized with {num_workers} workers")
+        logger.info(f"JobQueue initialized with pools: {self.pool_config}")
     
     def register_handler(self, job_type: str, handler: Callable):
         """
@@ -141,6 +281,15 @@ class JobQueue:
         self.job_handlers[job_type] = handler
         logger.info(f"Registered handler for job type: {job_type}")
     
+    def register_batch_handler(self, job_type: str, handler: Callable, max_batch: int):
+        """
+        Register a handler that processes up to max_batch queued jobs of a type at once.
+        Handler should accept a list of job dicts and return {job_id: result dict or Exception}.
+        """
+        if max_batch > 1:
+            self.batch_handlers[job_type] = (handler, max_batch)
+            logger.info(f"Registered batch handler for job type: {job_type} (up to {max_batch})")
+    
     def start(self):
         """Start the worker threads."""
         with self._lock:
@@ -148,18 +297,21 @@ class JobQueue:
                 logger.warning("JobQueue already started")
                 return
             
-            logger.info(f"Starting {self.num_workers} worker threads...")
+            logger.info(f"Starting {sum(self.pool_config.values())} worker threads...")
             
             # Create and start workers
-            for i in range(self.num_workers):
-                worker = JobWorker(
-                    worker_id=i + 1,
-                    job_queue=self.queue,
-                    job_handlers=self.job_handlers,
-                    stop_event=self.stop_event
-                )
-                worker.start()
-                self.workers.append(worker)
+            for pool, count in self.pool_config.items():
+                for _ in range(count):
+                    worker = JobWorker(
+                        worker_id=len(self.workers) + 1,
+                        job_queue=self.queues[pool],
+                        job_handlers=self.job_handlers,
+                        stop_event=self.stop_event,
+                        batch_handlers=self.batch_handlers,
+                        pool=pool
+                    )
+                    worker.start()
+                    self.workers.append(worker)
             
             # Load pending jobs from database
             self._load_pending_jobs()
@@ -175,6 +327,8 @@ class JobQueue:
             
             logger.info("Stopping JobQueue...")
             self.stop_event.set()
+            # Don't let workers sit out a retry backoff while we wait on them
+            cancel_retries()
             
             if wait:
                 for worker in self.workers:
@@ -209,13 +363,16 @@ class JobQueue:
         )
         
         job_id = job['id']
-        
-        # Add to queue (negative priority for max heap behavior)
-        self.queue.put((-priority, job_id))
+        self.enqueue(job_type, job_id, priority)
         
         logger.info(f"Submitted job {job_id} ({job_type}) with priority {priority}")
         return job_id
     
+    def enqueue(self, job_type: str, job_id: str, priority: int = 0):
+        """Put an existing job on its pool's queue."""
+        # Negative priority for max heap behavior; the type lets workers batch without a DB read
+        self.queues[self.job_pools.get(job_type, DEFAULT_POOL)].put((-priority, job_id, job_type))
+    
     def _load_pending_jobs(self):
         """Load pending jobs from database on startup."""
         pending_jobs = Job.get_pending_jobs()
@@ -227,7 +384,7 @@ class JobQueue:
         logger.info(f"Loading {len(pending_jobs)} pending jobs from database...")
         
         for job in pending_jobs:
-            self.queue.put((-job['priority'], job['id']))
+            self.enqueue(job['type'], job['id'], job['priority'])
         
         logger.info(f"Loaded {len(pending_jobs)} pending jobs into queue")
     
@@ -239,12 +396,23 @@ class JobQueue:
         return success
     
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Get current status of a job."""
-        return Job.get_by_id(job_id)
+        """Get current status of a job, including progress not yet flushed to the DB."""
+        job = Job.get_by_id(job_id)
+        if job and job['status'] == Job.STATUS_RUNNING:
+            with _progress_lock:
+                cached = _progress_cache.get(job_id)
+            if cached:
+                job['progress'] = cached[0]
+                if cached[1]:
+                    job['output_data'] = {'progress_message': cached[1]}
+        elif job and job['status'] == Job.STATUS_PENDING:
+            # Lets the UI show "queued behind N" while the job's pool (e.g. downloads) is saturated
+            job['queue_depth'] = self.queues[self.job_pools.get(job['type'], DEFAULT_POOL)].qsize()
+        return job
     
     def get_queue_size(self) -> int:
         """Get number of jobs waiting in queue."""
-        return self.queue.qsize()
+        return sum(q.qsize() for q in self.queues.values())
     
     def get_worker_status(self) -> List[Dict[str, Any]]:
         """Get status of all workers."""
@@ -252,6 +420,7 @@ class JobQueue:
             {
                 'worker_id': worker.worker_id,
                 'name': worker.name,
+                'pool': worker.pool,
                 'alive': worker.is_alive(),
                 'current_job_id': worker.current_job_id
             }
@@ -263,6 +432,10 @@ class JobQueue:
         return {
             'num_workers': self.num_workers,
             'queue_size': self.get_queue_size(),
+            'pools': {
+                pool: {'workers': count, 'queue_size': self.queues[pool].qsize()}
+                for pool, count in self.pool_config.items()
+            },
             'workers': self.get_worker_status(),
             'started': self._started
         }
@@ -272,17 +445,19 @@ class JobQueue:
 _job_queue: Optional[JobQueue] = None
 
 
-def get_job_queue(num_workers: int = 4) -> JobQueue:
+def get_job_queue(num_workers: int = 4, pool_config: Dict[str, int] = None,
+                  job_pools: Dict[str, str] = None) -> JobQueue:
     """Get or create the global job queue instance."""
     global _job_queue
     if _job_queue is None:
-        _job_queue = JobQueue(num_workers=num_workers)
+        _job_queue = JobQueue(num_workers=num_workers, pool_config=pool_config, job_pools=job_pools)
     return _job_queue
 
 
-def init_job_queue(num_workers: int = 4) -> JobQueue:
+def init_job_queue(num_workers: int = 4, pool_config: Dict[str, int] = None,
+                   job_pools: Dict[str, str] = None) -> JobQueue:
     """Initialize and start the job queue."""
-    job_queue = get_job_queue(num_workers)
+    job_queue = get_job_queue(num_workers, pool_config, job_pools)
     if not job_queue._started:
         job_queue.start()
     return job_queue
@@ -293,17 +468,60 @@ def update_job_progress(job_id: str, progress: int, message: str = None):
     """
     Update job progress. Can be called from job handlers.
     
+    The first update, 0% and 100% are written straight away; updates arriving
+    within PROGRESS_FLUSH_INTERVAL of the last write are batched by a timer.
+    
     Args:
         job_id: Job ID
         progress: Progress percentage (0-100)
         message: Optional progress message
     """
+    global _flush_timer
     try:
-        output_data = {}
-        if message:
-            output_data['progress_message'] = message
-        
-        Job.update_status(job_id, Job.STATUS_RUNNING, progress=progress, output_data=output_data)
+        now = time.monotonic()
+        # Only the cache is touched under the lock; the DB write happens after it is released
+        with _progress_lock:
+            cached = _progress_cache.get(job_id)
+            if cached and not message:
+                message = cached[1]  # A bare percentage keeps the last message, as the DB row would
+            flush_now = cached is None or progress in (0, 100) or now - cached[2] >= PROGRESS_FLUSH_INTERVAL
+            if flush_now:
+                _progress_cache[job_id] = (progress, message, now, False)
+            else:
+                _progress_cache[job_id] = (progress, message, cached[2], True)
+                if _flush_timer is None:
+                    _flush_timer = threading.Timer(PROGRESS_FLUSH_INTERVAL, _flush_progress)
+                    _flush_timer.daemon = True
+                    _flush_timer.start()
+        if flush_now:
+            # Guarded on status = running, so it can't undo a final status or cancel written meanwhile
+            Job.update_progress_many([(job_id, progress, {'progress_message': message} if message else None)])
         logger.debug(f"Job {job_id} progress: {progress}% - {message if message else ''}")
     except Exception as e:
         logger.error(f"Failed to update job progress: {str(e)}")
+
+
+def _flush_progress():
+    """Write all deferred progress updates in one transaction."""
+    global _flush_timer
+    with _progress_lock:
+        _flush_timer = None
+        now = time.monotonic()
+        updates = []
+        for job_id, (progress, message, _, dirty) in list(_progress_cache.items()):
+            if dirty:
+                updates.append((job_id, progress, {'progress_message': message} if message else None))
+                _progress_cache[job_id] = (progress, message, now, False)
+    # Written outside the lock so progress ticks never queue behind DB I/O; the write only touches
+    # rows still running, so a final status written in between is never overwritten by stale progress
+    try:
+        Job.update_progress_many(updates)
+    except Exception as e:
+        logger.error(f"Failed to flush job progress: {str(e)}")
+
+
+def discard_job_progress(job_id: str):
+    """Drop a finished job's cached progress before its final status is written."""
+    with _progress_lock:
+        _progress_cache.pop(job_id, None)
+    forget_progress_rate_limit(job_id)
@@ -1,12 +1,20 @@
 from functools import wraps
-from flask import session, redirect, url_for, request, jsonify
+from flask import session, redirect, url_for, request, jsonify, current_app
+
+API_PREFIX = '/api'
+
+def _unauthorized():
+    if request.path.startswith(API_PREFIX):
+        return jsonify({'error': 'Unauthorized'}), 401
+    return redirect(url_for('pages.login', next=request.url))
 
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        # No session cookie means anonymous: skip loading and verifying the signed session
+        if current_app.config['SESSION_COOKIE_NAME'] not in request.cookies:
+            return _unauthorized()
         if not session.get('logged_in'):
-            if request.path.startswith('/api'):
-                return jsonify({'error': 'Unauthorized'}), 401
-            return redirect(url_for('pages.login', next=request.url))
+            return _unauthorized()
         return f(*args, **kwargs)
     return decorated_function
@@ -1,41 +1,122 @@
 import os
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
+from database.models import Job
 
 logger = logging.getLogger(__name__)
 
-def run_storage_cleanup(max_age_hours=48):
-    """Automatically delete old processed files and downloads to save space."""
-    now = time.time()
-    max_age_seconds = max_age_hours * 3600
-    
-    folders_to_clean = [
-        Config.UPLOAD_FOLDER,
-        Config.PROCESSED_FOLDER,
-        Config.CAPTIONS_FOLDER
-    ]
-    
+# Walk and unlink relative to open directory fds where the platform allows it (Linux/BSD),
+# so each file costs one name lookup instead of a full path resolution per stat and per unlink
+HAS_DIR_FD = (os.scandir in os.supports_fd and os.open in os.supports_dir_fd
+              and os.unlink in os.supports_dir_fd)
+
+# Unlinks are issued in bounded batches with a short pause between them, so a large cleanup
+# doesn't flood the SSD with discards while jobs are reading and writing video
+UNLINK_BATCH_SIZE = 256
+UNLINK_BATCH_PAUSE = 0.001  # seconds
+
+# Storage roots, resolved once; Config folders don't change at runtime
+_STORAGE_ROOTS = (Config.UPLOAD_FOLDER, Config.PROCESSED_FOLDER, Config.CAPTIONS_FOLDER)
+
+# Background runner so callers (server startup) don't wait on a full cleanup pass;
+# a single worker keeps at most one pass in flight
+_cleanup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='unlinker')
+
+def _unlink_batched(dir_ref, victims, display_path):
+    """Unlink (name, size) victims of one directory in batches; returns (count, bytes)."""
     deleted_count = 0
     freed_space = 0
+    for i in range(0, len(victims), UNLINK_BATCH_SIZE):
+        if i:
+            time.sleep(UNLINK_BATCH_PAUSE)
+        for name, size in victims[i:i + UNLINK_BATCH_SIZE]:
+            try:
+                if HAS_DIR_FD:
+                    os.unlink(name, dir_fd=dir_ref)
+                else:
+                    os.remove(os.path.join(dir_ref, name))
+                deleted_count += 1
+                freed_space += size
+            except Exception as e:
+                logger.error(f"Error cleaning file {os.path.join(display_path, name)}: {e}")
+    return deleted_count, freed_space
+
+def _clean_dir(dir_ref, cutoff, display_path):
+    """Delete files under dir_ref (an fd or path) last modified before cutoff; returns (count, bytes)."""
+    victims = []
+    subdirs = []
+    # Pass 1: collect this directory's expired files; scandir already fetched the inodes
+    with os.scandir(dir_ref) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                    continue
+                file_stat = entry.stat(follow_symlinks=False)
+                if file_stat.st_mtime < cutoff:
+                    victims.append((entry.name, file_stat.st_size))
+            except Exception as e:
+                logger.error(f"Error cleaning file {os.path.join(display_path, entry.name)}: {e}")
+    
+    # Pass 2: unlink them together, keeping each directory's deletions adjacent
+    deleted_count, freed_space = _unlink_batched(dir_ref, victims, display_path)
     
-    for folder in folders_to_clean:
-        if not os.path.exists(folder):
-            continue
-            
-        for root, dirs, files in os.walk(folder):
-            for f in files:
-                file_path = os.path.join(root, f)
+    for name in subdirs:
+        try:
+            if HAS_DIR_FD:
+                sub_fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY, dir_fd=dir_ref)
                 try:
-                    # Check if file is older than max_age
-                    file_stat = os.stat(file_path)
-                    if (now - file_stat.st_mtime) > max_age_seconds:
-                        file_size = file_stat.st_size
-                        os.remove(file_path)
-                        deleted_count += 1
-                        freed_space += file_size
-                except Exception as e:
-                    logger.error(f"Error cleaning file {file_path}: {e}")
-                    
+                    count, freed = _clean_dir(sub_fd, cutoff, os.path.join(display_path, name))
+                finally:
+                    os.close(sub_fd)
+            else:
+                count, freed = _clean_dir(os.path.join(dir_ref, name), cutoff, os.path.join(display_path, name))
+            deleted_count += count
+            freed_space += freed
+        except Exception as e:
+            logger.error(f"Error cleaning directory {os.path.join(display_path, name)}: {e}")
+    return deleted_count, freed_space
+
+def _clean_folder(folder, cutoff):
+    """Clean one storage root; returns (count, bytes)."""
+    if not os.path.isdir(folder):
+        return 0, 0
+    if HAS_DIR_FD:
+        dir_fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            return _clean_dir(dir_fd, cutoff, folder)
+        finally:
+            os.close(dir_fd)
+    return _clean_dir(folder, cutoff, folder)
+
+def run_storage_cleanup(max_age_hours=48):
+    """Automatically delete old processed files and downloads to save space."""
+    cutoff = time.time() - max_age_hours * 3600
+
+    # The roots are independent trees and the walk is bound by metadata syscalls (which release
+    # the GIL), so they're cleaned side by side
+    with ThreadPoolExecutor(max_workers=len(_STORAGE_ROOTS), thread_name_prefix='cleanup') as pool:
+        results = list(pool.map(lambda folder: _clean_folder(folder, cutoff), _STORAGE_ROOTS))
+
+    deleted_count = sum(count for count, _ in results)
+    freed_space = sum(freed for _, freed in results)
+
     if deleted_count > 0:
         logger.info(f"Storage Cleanup: Removed {deleted_count} old files, freed {freed_space / (1024*1024):.2f} MB")
+
+    # Finished job rows are never read again once their outputs are gone; without this the
+    # jobs table (and every status/listing query over it) grows for the life of the install
+    Job.delete_old_jobs(days=Config.JOB_RETENTION_DAYS)
+
+def _log_cleanup_failure(future):
+    error = future.exception()
+    if error:
+        logger.error(f"Storage cleanup failed: {error}")
+
+def run_storage_cleanup_async(max_age_hours=48):
+    """Queue a cleanup pass in the background and return its Future right away."""
+    future = _cleanup_pool.submit(run_storage_cleanup, max_age_hours)
+    future.add_done_callback(_log_cleanup_failure)
+    return future
@@ -1,30 +1,55 @@
 import os
+import sys
+import shutil
+import json
+import re
 import time
 import subprocess
 import logging
 import threading
+from collections import deque
 import yt_dlp
 from urllib.parse import urlparse
-from functools import wraps
-from typing import List, Optional, Dict, Any
+from functools import wraps, lru_cache
+from typing import List, Optional, Dict, Any, Tuple
 from config import Config
+from database.models import Job
 
 logger = logging.getLogger(__name__)
 
-def retry_on_failure(max_retries=3, delay=2, exceptions=(Exception,)):
-    """Decorator for retry logic"""
+# orjson parses/serializes in C; fall back to the stdlib json module if missing
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Set on shutdown so retry backoffs stop waiting instead of holding up worker threads
+_retry_cancel = threading.Event()
+
+def cancel_retries():
+    """Abort pending retry backoffs; decorated calls re-raise their last error."""
+    _retry_cancel.set()
+
+def retry_on_failure(max_retries=3, delay=2, exceptions=(Exception,), retry_kwargs=None, cancel_event=None):
+    """Decorator for retry logic; retry_kwargs are merged into the call on every attempt after the first"""
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
+            cancel = cancel_event or _retry_cancel
             last_exception = None
             for attempt in range(max_retries):
                 try:
+                    if attempt and retry_kwargs:
+                        kwargs = {**kwargs, **retry_kwargs}
                     return func(*args, **kwargs)
                 except exceptions as e:
                     last_exception = e
                     if attempt < max_retries - 1:
                         logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {str(e)}. Retrying in {delay}s...")
-                        time.sleep(delay * (attempt + 1))  # Exponential backoff
+                        if cancel.wait(delay * (attempt + 1)):  # Exponential backoff, cut short on shutdown
+                            logger.warning(f"Retries cancelled for {func.__name__}")
+                            break
                     else:
                         logger.error(f"All {max_retries} attempts failed for {func.__name__}: {str(e)}")
             raise last_exception
@@ -42,24 +67,28 @@ def is_valid_url(url):
         logger.error(f"URL validation error: {str(e)}")
         return False
 
+# Platform hostnames matched case-insensitively in one regex scan; the group picks the platform
+_PLATFORM_RE = re.compile(r'(youtube\.com|youtu\.be|tiktok\.com|instagram\.com|instagr\.am)', re.IGNORECASE)
+_PLATFORM_BY_HOST = {
+    'youtube.com': 'youtube',
+    'youtu.be': 'youtube',
+    'tiktok.com': 'tiktok',
+    'instagram.com': 'instagram',
+    'instagr.am': 'instagram',
+}
+
 def detect_platform(url):
     """Detect the platform from URL"""
     try:
-        url_lower = url.lower()
-        if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-            return 'youtube'
-        elif 'tiktok.com' in url_lower:
-            return 'tiktok'
-        elif 'instagram.com' in url_lower or 'instagr.am' in url_lower:
-            return 'instagram'
-        else:
-            return 'direct'
+        match = _PLATFORM_RE.search(url)
+        return _PLATFORM_BY_HOST[match.group(1).lower()] if match else 'direct'
     except Exception as e:
         logger.error(f"Platform detection error: {str(e)}")
         return 'direct'
 
+@lru_cache(maxsize=1)
 def check_ffmpeg_available():
-    """Check if FFmpeg is available"""
+    """Check if FFmpeg is available (probed once per process)"""
     try:
         result = subprocess.run(['ffmpeg', '-version'], capture_output=True, timeout=5)
         return result.returncode == 0
@@ -67,12 +96,331 @@ def check_ffmpeg_available():
         logger.error(f"FFmpeg check failed: {str(e)}")
         return False
 
+# Hardware H.264 encoders in order of preference, libx264 is the software fallback
+HW_H264_ENCODERS = ['h264_nvenc', 'h264_qsv', 'h264_vaapi', 'h264_videotoolbox']
+_h264_encoder = None
+
+def _encoder_works(encoder: str) -> bool:
+    """Encode a few blank frames to confirm the encoder has usable hardware behind it."""
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        *h264_device_args(encoder),
+        '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1',
+        *h264_video_args(encoder, None),
+        '-f', 'null', '-'
+    ]
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=15).returncode == 0
+    except Exception:
+        return False
+
+def get_h264_encoder() -> str:
+    """Pick the fastest working H.264 encoder once per process."""
+    global _h264_encoder
+    if _h264_encoder is not None:
+        return _h264_encoder
+
+    encoder = 'libx264'
+    if Config.VIDEO_ENCODER != 'auto':
+        encoder = Config.VIDEO_ENCODER
+    else:
+        try:
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True, timeout=10)
+            available = result.stdout
+        except Exception as e:
+            logger.warning(f"Could not list FFmpeg encoders: {str(e)}")
+            available = ''
+        for candidate in HW_H264_ENCODERS:
+            if f" {candidate} " in available and _encoder_works(candidate):
+                encoder = candidate
+                break
+
+    logger.info(f"Using H.264 encoder: {encoder}")
+    _h264_encoder = encoder
+    return encoder
+
+# The arg builders below are pure functions of their inputs and startup Config, so each
+# combination is built once and shared as an immutable tuple
+@lru_cache(maxsize=None)
+def h264_encoder_args(encoder: str, crf: int = 20, preset: str = 'medium') -> Tuple[str, ...]:
+    """FFmpeg video codec args for an encoder at roughly the given libx264 quality."""
+    if encoder == 'h264_nvenc':
+        return ('-c:v', encoder, '-preset', 'p4', '-rc', 'vbr', '-cq', str(crf), '-b:v', '0')
+    if encoder == 'h264_qsv':
+        return ('-c:v', encoder, '-preset', 'medium', '-global_quality', str(crf))
+    if encoder == 'h264_vaapi':
+        return ('-c:v', encoder, '-qp', str(crf))
+    if encoder == 'h264_videotoolbox':
+        return ('-c:v', encoder, '-b:v', '6M')
+    if Config.X264_PRESET:
+        # Deployment-wide speed override for the software path (e.g. ultrafast on CPU-only hosts)
+        preset = Config.X264_PRESET
+    args = ('-c:v', encoder, '-preset', preset, '-crf', str(crf), '-threads', str(Config.FFMPEG_THREADS_PER_JOB))
+    if Config.X264_ZEROLATENCY:
+        args += ('-tune', 'zerolatency')
+    return args
+
+@lru_cache(maxsize=None)
+def h264_device_args(encoder: str) -> Tuple[str, ...]:
+    """Global FFmpeg args (placed before -i) that the encoder needs."""
+    if encoder == 'h264_vaapi':
+        return ('-vaapi_device', Config.VAAPI_DEVICE)
+    return ()
+
+@lru_cache(maxsize=None)
+def hwaccel_args(encoder: str, keep_on_gpu: bool = False) -> Tuple[str, ...]:
+    """Input args (placed before -i) that decode on the hardware paired with the encoder."""
+    if not Config.HWACCEL_DECODE:
+        return ()
+    if encoder == 'h264_nvenc':
+        # keep_on_gpu leaves frames in CUDA memory for GPU-only filter graphs
+        return ('-hwaccel', 'cuda') + (('-hwaccel_output_format', 'cuda') if keep_on_gpu else ())
+    if encoder == 'h264_vaapi':
+        return ('-hwaccel', 'vaapi')
+    if encoder == 'h264_videotoolbox':
+        return ('-hwaccel', 'videotoolbox')
+    return ('-hwaccel', 'auto')
+
+@lru_cache(maxsize=256)
+def h264_video_args(encoder: str, vf: Optional[str], crf: int = 20, preset: str = 'medium') -> Tuple[str, ...]:
+    """Filter and codec args; VAAPI gets its frames uploaded to the GPU after the CPU filters."""
+    if encoder == 'h264_vaapi':
+        vf = f"{vf},format=nv12,hwupload" if vf else "format=nv12,hwupload"
+    args = ('-vf', vf) if vf else ()
+    return args + h264_encoder_args(encoder, crf=crf, preset=preset)
+
+_cpu_slot_lock = threading.Lock()
+_cpu_slots_in_use = set()
+# Caps re-encodes across all job workers; downloads and stream copies never wait on it
+_encode_slots = threading.BoundedSemaphore(max(1, Config.MAX_CONCURRENT_ENCODES))
+_DECODE_THREAD_ARGS = ('-threads', str(Config.FFMPEG_THREADS_PER_JOB),
+                       '-filter_threads', str(Config.FFMPEG_THREADS_PER_JOB),
+                       '-filter_complex_threads', str(Config.FFMPEG_THREADS_PER_JOB))
+
+@lru_cache(maxsize=1)
+def _ffmpeg_priority_prefix() -> Tuple[str, ...]:
+    """nice/ionice wrapper for ffmpeg commands, or () where they aren't available."""
+    if not sys.platform.startswith('linux'):
+        return ()
+    prefix = ()
+    if Config.FFMPEG_NICE and shutil.which('nice'):
+        prefix += ('nice', '-n', str(Config.FFMPEG_NICE))
+    if Config.FFMPEG_IONICE and shutil.which('ionice'):
+        prefix += ('ionice', '-c2', '-n7')
+    return prefix
+
+def _acquire_cpu_slot() -> Optional[int]:
+    """Claim a free block of FFMPEG_THREADS_PER_JOB cores, or None when all are taken."""
+    with _cpu_slot_lock:
+        for slot in range(max(1, (os.cpu_count() or 1) // Config.FFMPEG_THREADS_PER_JOB)):
+            if slot not in _cpu_slots_in_use:
+                _cpu_slots_in_use.add(slot)
+                return slot
+    return None
+
+def _release_cpu_slot(slot: Optional[int]):
+    if slot is not None:
+        with _cpu_slot_lock:
+            _cpu_slots_in_use.discard(slot)
+
+def run_ffmpeg(cmd: List[str], status_key=None, duration: Optional[float] = None,
+               progress_range=(0, 100), timeout=None, check: bool = True, pin: bool = False,
+               encode: bool = False) -> subprocess.CompletedProcess:
+    """Run ffmpeg with stderr streamed line by line; -progress output drives the job status, the rest is kept as a short tail."""
+    if encode:
+        # The encoder's own -threads is set by h264_video_args; cap the decoder and filter graph
+        # too, or each concurrent encode still spins up a thread per core for those stages
+        i = cmd.index('ffmpeg') + 1
+        cmd = cmd[:i] + list(_DECODE_THREAD_ARGS) + cmd[i:]
+        with _encode_slots:
+            return run_ffmpeg(cmd, status_key, duration, progress_range, timeout, check, pin)
+    i = cmd.index('ffmpeg') + 1
+    # Only errors are logged to stderr, so a successful run writes little beyond -progress
+    log_args = [] if '-loglevel' in cmd or '-v' in cmd else ['-hide_banner', '-loglevel', 'error']
+    cmd = cmd[:i] + log_args + ['-progress', 'pipe:2', '-nostats'] + cmd[i:]
+    slot = None
+    if pin and Config.FFMPEG_PIN_CPUS and sys.platform.startswith('linux') and shutil.which('taskset'):
+        slot = _acquire_cpu_slot()
+        if slot is not None:
+            # Disjoint core ranges keep concurrent encodes from bouncing across each other's caches
+            first = slot * Config.FFMPEG_THREADS_PER_JOB
+            cmd = ['taskset', '-c', f"{first}-{first + Config.FFMPEG_THREADS_PER_JOB - 1}"] + cmd
+    # Encodes yield the CPU and disk to the web server's request threads
+    cmd = list(_ffmpeg_priority_prefix()) + cmd
+    try:
+        return _run_ffmpeg(cmd, status_key, duration, progress_range, timeout, check)
+    finally:
+        _release_cpu_slot(slot)
+
+def _run_ffmpeg(cmd, status_key, duration, progress_range, timeout, check) -> subprocess.CompletedProcess:
+    # stderr stays bytes: progress lines are parsed as-is and only the kept tail is ever decoded
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    tail = deque(maxlen=50)
+    lo, hi = progress_range
+
+    def pump():
+        last = -1
+        for line in proc.stderr:
+            line = line.strip()
+            key, sep, value = line.partition(b'=')
+            if not sep or b' ' in line:
+                tail.append(line)
+            elif key == b'out_time_us' and status_key and duration and value.isdigit():
+                progress = int(lo + min(int(value) / 1e6 / duration, 1.0) * (hi - lo))
+                if progress > last:
+                    last = progress
+                    thread_safe_status_update(status_key, {'progress': progress})
+
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    finally:
+        reader.join()
+        proc.stderr.close()
+
+    stderr = b"\n".join(tail).decode('utf-8', 'replace')
+    if check and proc.returncode != 0:
+        logger.error(f"FFmpeg exited with {proc.returncode}: {stderr}")
+        raise subprocess.CalledProcessError(proc.returncode, cmd, None, stderr)
+    return subprocess.CompletedProcess(cmd, proc.returncode, None, stderr)
+
+def run_h264_encode(build_cmd, check: bool = False, **kwargs) -> subprocess.CompletedProcess:
+    """Run build_cmd(encoder) on the detected encoder, falling back to libx264 if the hardware encode fails."""
+    encoder = get_h264_encoder()
+    result = run_ffmpeg(build_cmd(encoder), check=False, pin=encoder == 'libx264', encode=True, **kwargs)
+    if result.returncode != 0 and encoder != 'libx264':
+        logger.warning(f"{encoder} encode failed (exit {result.returncode}), retrying with libx264")
+        result = run_ffmpeg(build_cmd('libx264'), check=False, pin=True, encode=True, **kwargs)
+    if check and result.returncode != 0:
+        raise subprocess.CalledProcessError(result.returncode, result.args, result.stdout, result.stderr)
+    return result
+
+@lru_cache(maxsize=256)
+def _probe(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    cmd = ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_streams', '-show_format', path]
+    result = subprocess.run(cmd, capture_output=True, timeout=30, check=True)
+    return orjson.loads(result.stdout) if HAS_ORJSON else json.loads(result.stdout)
+
+def probe_video(path: str) -> Dict[str, Any]:
+    """ffprobe streams and format for a file, cached until the file changes on disk."""
+    st = os.stat(path)
+    return _probe(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=64)
+def _keyframes(path: str, mtime_ns: int, size: int) -> Tuple[float, ...]:
+    # Packet flags come from the demuxer alone, so nothing is decoded
+    cmd = ['ffprobe', '-v', 'error', '-select_streams', 'v:0',
+           '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=120, check=True)
+    times = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        if 'K' in flags and pts_time not in ('', 'N/A'):
+            times.append(float(pts_time))
+    return tuple(sorted(times))
+
+def probe_keyframes(path: str) -> Tuple[float, ...]:
+    """Video keyframe timestamps in seconds, cached until the file changes on disk."""
+    st = os.stat(path)
+    return _keyframes(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+def aac_audio_args(path: str, bitrate: str = '192k') -> List[str]:
+    """Copy the audio when the source is already AAC, otherwise encode it to AAC."""
+    try:
+        audio = next((s for s in probe_video(path).get('streams', []) if s.get('codec_type') == 'audio'), None)
+    except Exception:
+        audio = None
+    if audio and audio.get('codec_name') == 'aac':
+        return ['-c:a', 'copy']
+    return ['-c:a', 'aac', '-b:a', bitrate]
+
+# Source codecs NVDEC can decode (and crop/resize on the way out) via the *_cuvid decoders
+CUVID_CODECS = {'h264', 'hevc', 'vp8', 'vp9', 'av1', 'mpeg2video', 'mpeg4', 'mjpeg'}
+
+def cuvid_cover_args(path: str, width: int, height: int) -> Optional[List[str]]:
+    """NVDEC input args that center-crop the source to width:height and resize it while decoding, or None."""
+    try:
+        stream = next((s for s in probe_video(path).get('streams', []) if s.get('codec_type') == 'video'), None)
+    except Exception:
+        return None
+    if not stream or stream.get('codec_name') not in CUVID_CODECS or not stream.get('width') or not stream.get('height'):
+        return None
+    src_w, src_h = int(stream['width']), int(stream['height'])
+    # Same framing as scale=force_original_aspect_ratio=increase plus a centered crop; margins kept even
+    top = bottom = left = right = 0
+    if src_w * height > src_h * width:
+        left = right = (src_w - src_h * width // height) // 4 * 2
+    else:
+        top = bottom = (src_h - src_w * height // width) // 4 * 2
+    return [
+        '-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda',
+        '-c:v', f"{stream['codec_name']}_cuvid",
+        '-crop', f"{top}x{bottom}x{left}x{right}", '-resize', f"{width}x{height}"
+    ]
+
+def probe_duration(path: str) -> Optional[float]:
+    """Container duration in seconds, or None if ffprobe can't tell."""
+    try:
+        return float(probe_video(path)['format']['duration'])
+    except Exception:
+        return None
+
+def media_info(path: str) -> Dict[str, Any]:
+    """Duration and first video stream dimensions for a video record; missing values are None."""
+    try:
+        info = probe_video(path)
+    except Exception as e:
+        logger.warning(f"Could not probe {path}: {e}")
+        return {'duration': None, 'width': None, 'height': None}
+    video = next((s for s in info.get('streams', []) if s.get('codec_type') == 'video'), {})
+    duration = info.get('format', {}).get('duration')
+    return {
+        'duration': float(duration) if duration else None,
+        'width': video.get('width'),
+        'height': video.get('height'),
+    }
+
+def file_size(path: str) -> Optional[int]:
+    """Size in bytes from a single stat, or None if the file is missing."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+def remove_file(path: str) -> bool:
+    """Delete a file if present; returns whether anything was removed."""
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+# Anything but letters, digits, underscore, space, dash and dot ('\w' is exactly isalnum() or '_')
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w \-.]')
+
 def sanitize_filename(name: str) -> str:
     """Create a safe filename from arbitrary text."""
-    safe = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_', '.')).strip()
+    safe = _UNSAFE_FILENAME_RE.sub('', name).strip()
     safe = safe.replace(' ', '_')
     return safe or f"video_{int(time.time())}"
 
+# One metadata-only YoutubeDL per worker thread: building one loads the whole extractor
+# registry, and an instance isn't safe to share between threads mid-extraction
+_title_ydl = threading.local()
+
+def _get_title_ydl():
+    """Return this thread's reusable metadata-only YoutubeDL."""
+    ydl = getattr(_title_ydl, 'ydl', None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True, 'skip_download': True})
+        _title_ydl.ydl = ydl
+    return ydl
+
 def extract_title(url: str) -> str:
     """Try to extract a human-friendly title from the URL/platform."""
     try:
@@ -84,71 +432,138 @@ def extract_title(url: str) -> str:
                 return os.path.splitext(basename)[0]
             return parsed.netloc
         # Use yt-dlp metadata without downloading
-        ydl_opts = {'quiet': True, 'no_warnings': True, 'skip_download': True}
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            return info.get('title') or info.get('id') or 'video'
+        info = _get_title_ydl().extract_info(url, download=False)
+        return info.get('title') or info.get('id') or 'video'
     except Exception as e:
         logger.warning(f"Failed to extract title: {str(e)}")
         return "video"
 
+# Storage folders are fixed for the process lifetime, so they're resolved once at import
+_PROJECT_DIRS = (Config.UPLOAD_FOLDER, Config.PROCESSED_FOLDER, Config.CAPTIONS_FOLDER)
+
+# Set once this process has created the folders; the app never removes them
+_dirs_ready = False
+_dirs_lock = threading.Lock()
+
 def ensure_project_dirs(project_id: str):
     """Ensure project directories exist (Simplified to use main folders)."""
+    global _dirs_ready
     # We no longer separate by project_id in folders, but we keep this for legacy calls
-    os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-    os.makedirs(Config.PROCESSED_FOLDER, exist_ok=True)
-    os.makedirs(Config.CAPTIONS_FOLDER, exist_ok=True)
-    return Config.UPLOAD_FOLDER, Config.PROCESSED_FOLDER, Config.CAPTIONS_FOLDER
+    if not _dirs_ready:
+        with _dirs_lock:
+            for folder in _PROJECT_DIRS:
+                os.makedirs(folder, exist_ok=True)
+            _dirs_ready = True
+    return _PROJECT_DIRS
 
-# State for progress rate limiting
-_progress_locks = threading.Lock()
+# Parsed admin_config.json, re-read only when the file's mtime changes
+_admin_config_lock = threading.Lock()
+_admin_config_cache = {'mtime': None, 'data': {}}
+
+def get_admin_config_path() -> str:
+    """Absolute path of the admin_config.json file."""
+    return os.path.join(os.getcwd(), 'admin_config.json')
+
+def load_admin_config() -> Dict[str, Any]:
+    """Load admin_config.json, serving the cached copy while the file is unchanged."""
+    config_path = get_admin_config_path()
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    with _admin_config_lock:
+        if _admin_config_cache['mtime'] != mtime:
+            with open(config_path, 'rb') as f:
+                raw = f.read()
+            _admin_config_cache['data'] = orjson.loads(raw) if HAS_ORJSON else json.loads(raw)
+            _admin_config_cache['mtime'] = mtime
+        # Hand out a copy so callers can't mutate the cached dict
+        return dict(_admin_config_cache['data'])
+
+def save_admin_config(config: Dict[str, Any]):
+    """Write admin_config.json atomically and keep the written dict as the cached copy."""
+    with _admin_config_lock:
+        if HAS_ORJSON:
+            payload = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(config, indent=2).encode('utf-8')
+        config_path = get_admin_config_path()
+        # Write beside the target and swap it in, so a concurrent load never parses a half-written file
+        tmp_path = f"{config_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, config_path)
+        # The next load sees a matching mtime and skips re-reading what was just written
+        _admin_config_cache['data'] = dict(config)
+        _admin_config_cache['mtime'] = os.stat(config_path).st_mtime_ns
+
+# State for progress rate limiting: (monotonic time, percent) per status key.
+# Unlocked on purpose - single dict get/set/pop are atomic under the GIL, and a race between
+# two callbacks for the same key costs at most one duplicate (coalesced) progress update
 _last_progress_time = {}
 
+def forget_progress_rate_limit(status_key):
+    """Drop a job's rate-limit entry once it has finished, so the map only holds live jobs."""
+    _last_progress_time.pop(status_key, None)
+
+# task_queue.job_queue imports this module, so its progress writer is bound on first use
+_update_job_progress = None
+
+def _get_progress_writer():
+    global _update_job_progress
+    if _update_job_progress is None:
+        from task_queue.job_queue import update_job_progress
+        _update_job_progress = update_job_progress
+    return _update_job_progress
+
 def thread_safe_status_update(status_key, update_dict):
     """Legacy helper for backward compatibility - updates job status in DB."""
-    from database.models import Job
     # We assume status_key is the job_id. Only update if it's a real job.
     # To reduce DB calls, we don't call get_by_id here every time.
     # The update_status method will handle if the ID doesn't exist.
     progress = update_dict.get('progress')
-    status = update_dict.get('status')
     error = update_dict.get('error')
     
-    if not status and progress is None and not error:
+    if error or update_dict.get('status') == 'error':
+        # A service's error is one attempt's: @retry_on_failure may still rerun it, and the
+        # worker's _mark_failed records the job's failure once the handler gives up. Writing
+        # FAILED here would stick through the retry (progress only updates running jobs).
+        # A failed download never reports 'finished', so drop its rate-limit entry here
+        _last_progress_time.pop(status_key, None)
+        logger.warning(f"Job {status_key} attempt failed: {error}")
         return
-
-    # Map old statuses to new job statuses if needed
-    mapped_status = None
-    if status == 'completed': mapped_status = Job.STATUS_COMPLETED
-    elif status == 'error': mapped_status = Job.STATUS_FAILED
-    elif status: mapped_status = Job.STATUS_RUNNING
-    
-    try:
-        Job.update_status(status_key, mapped_status, progress=progress, error_message=error)
-    except Exception as e:
-        logger.error(f"Failed to update status for {status_key}: {str(e)}")
+    if progress is None:
+        return
+    # Everything else is a step inside a running job (a service's 'completed' is not the job's:
+    # the worker marks that once the handler returns), so it goes through the coalesced
+    # in-memory progress path, which writes to the DB at most every flush interval
+    _get_progress_writer()(status_key, progress, update_dict.get('message'))
 
 def thread_safe_status_get(status_key):
     """Legacy helper - gets job status from DB."""
-    from database.models import Job
     return Job.get_by_id(status_key) or {}
 
 def update_progress(d, status_key):
     """Update job progress during download/processing with rate limiting"""
     try:
-        if d.get('status') == 'downloading':
-            now = time.time()
-            with _progress_locks:
-                last_time = _last_progress_time.get(status_key, 0)
-                # Rate limit: max once per second
-                if now - last_time < 1.0:
-                    return
-                _last_progress_time[status_key] = now
-
+        status = d.get('status')
+        if status == 'finished':
+            _last_progress_time.pop(status_key, None)
+            return
+        if status == 'downloading':
             total = d.get('total_bytes') or d.get('total_bytes_estimate')
-            if total:
-                progress = int((d['downloaded_bytes'] / total) * 100)
-                thread_safe_status_update(status_key, {'progress': progress})
+            if not total:
+                return
+            progress = int((d['downloaded_bytes'] / total) * 100)
+            now = time.monotonic()
+            last_time, last_progress = _last_progress_time.get(status_key, (float('-inf'), -1))
+            # Rate limit: max once per second, and only when the percentage moved
+            if now - last_time < 1.0 or progress == last_progress:
+                return
+            _last_progress_time[status_key] = (now, progress)
+
+            thread_safe_status_update(status_key, {'progress': progress})
     except Exception as e:
         # Silent failure for progress to avoid crashing the main task
         pass
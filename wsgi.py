@@ -0,0 +1,22 @@
+"""
+Production entrypoint for a threaded WSGI server:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+gunicorn.conf.py runs a single threaded worker process: the job queue, progress cache and
+Socket.IO sessions all live in-process, so extra workers would each start their own queue.
+"""
+import logging
+from app import app
+from utils.helpers import check_ffmpeg_available
+from utils.cleanup import run_storage_cleanup_async
+
+logger = logging.getLogger(__name__)
+
+if not check_ffmpeg_available():
+    logger.warning("FFmpeg not found! Video processing will fail. Please install FFmpeg.")
+
+# Same one-time startup cleanup app.py runs under its dev server
+run_storage_cleanup_async(max_age_hours=48)
+
+application = app